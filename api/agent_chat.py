@@ -18,6 +18,9 @@ from api.settings import get_enabled_skills_prompt
 
 router = APIRouter(prefix="/api/agent-chat", tags=["agent-chat"])
 
+# Block types that force a message to be saved as a block list
+SPECIAL_BLOCK_TYPES = frozenset({"tool_use", "tool_result", "surface_content", "thinking"})
+
 # Memory system prompt instruction
 MEMORY_SYSTEM_PROMPT = """
 IMPORTANT: You have access to a persistent memory system. ALWAYS check your memory at the start of conversations.
@@ -454,8 +457,7 @@ Please acknowledge the guidance briefly and continue your work, incorporating th
             # Final DB save
             if conversation_id and msg_record:
                 has_special_blocks = any(
-                    c.get("type") in ("tool_use", "tool_result", "surface_content", "thinking")
-                    for c in accumulated_content
+                    c.get("type") in SPECIAL_BLOCK_TYPES for c in accumulated_content
                 )
                 final_content = accumulated_content if len(accumulated_content) > 1 or has_special_blocks \
                     else (accumulated_content[0].get("text", "") if accumulated_content else "")
@@ -47,6 +47,31 @@ class DefaultSettings(BaseModel):
     skills: Optional[List[dict]] = None  # List of skill definitions
 
 
+def _clear_resolved_settings() -> None:
+    """Invalidate SettingsService's resolution cache after a write."""
+    # Imported lazily: settings_service imports this module
+    from services.settings_service import clear_settings_cache
+    clear_settings_cache()
+
+
+def _file_stamp(path: Path) -> Optional[tuple]:
+    """(mtime_ns, size) of a file, or None if it can't be stat'ed."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def settings_files_version() -> tuple:
+    """Stamp of the default and project settings files.
+
+    Changes whenever either file is rewritten, including by edits made
+    outside this module.
+    """
+    return _file_stamp(DEFAULT_SETTINGS_PATH), _file_stamp(PROJECT_SETTINGS_PATH)
+
+
 def load_default_settings() -> dict:
     """Load default settings from file."""
     if DEFAULT_SETTINGS_PATH.exists():
@@ -68,6 +93,7 @@ def save_default_settings(settings: dict) -> bool:
 
         with open(DEFAULT_SETTINGS_PATH, 'w') as f:
             json.dump(settings, f, indent=2)
+        _clear_resolved_settings()
         return True
     except IOError:
         return False
@@ -111,6 +137,7 @@ def save_all_project_settings(all_settings: dict) -> bool:
         PROJECT_SETTINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
         with open(PROJECT_SETTINGS_PATH, 'w') as f:
             json.dump(all_settings, f, indent=2)
+        _clear_resolved_settings()
         return True
     except IOError:
         return False
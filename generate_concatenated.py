@@ -54,8 +54,11 @@ FILE_DESCRIPTIONS = {
     # MCP Tools (Model Context Protocol servers)
     "tools/gif_mcp_server.py": "MCP server for GIF search functionality via Giphy API",
     "tools/gif_search.py": "GIF search helper functions",
+    "tools/_env.py": "Shared .env loader for the tool scripts",
+    "tools/_json_codec.py": "Shared JSON encoding (orjson when installed) for the MCP servers",
     "tools/memory_mcp_server.py": "MCP server for persistent memory storage across conversations",
     "tools/surface_mcp_server.py": "MCP server for surfacing content (HTML/markdown) to the user",
+    "tools/_script_zygote.py": "Pre-warmed forking Python runner for surface_from_script",
 
 }
 
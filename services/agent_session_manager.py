@@ -107,6 +107,9 @@ class AgentSessionManager:
     def get_lock(self, conversation_id: str) -> asyncio.Lock:
         """Get lock to prevent concurrent queries on same session.
 
+        asyncio.Lock only binds to an event loop when first contended, so
+        this is cheap and safe to call from sync code.
+
         Args:
             conversation_id: The conversation ID
 
@@ -141,6 +144,12 @@ class AgentSessionManager:
         if conversation_id in self._last_activity:
             del self._last_activity[conversation_id]
 
+    def _reset(self) -> None:
+        """Drop all sessions, locks and activity timestamps."""
+        self._sessions.clear()
+        self._locks.clear()
+        self._last_activity.clear()
+
     def cleanup_stale_sessions(self) -> int:
         """Remove sessions that have been inactive longer than TTL.
 
@@ -78,12 +78,9 @@ def _normalize_content_dict(content: Dict) -> Union[str, Dict]:
 
 def _normalize_content_blocks(blocks: List) -> List[Dict]:
     """Normalize a list of content blocks."""
-    normalized = []
-    for block in blocks:
-        normalized_block = normalize_block(block)
-        if normalized_block:
-            normalized.append(normalized_block)
-    return normalized
+    # normalize_block only returns None for None input, so filter those up front
+    _normalize = normalize_block
+    return [_normalize(block) for block in blocks if block is not None]
 
 
 def normalize_block(block: Any) -> Optional[Dict]:
@@ -95,6 +92,11 @@ def normalize_block(block: Any) -> Optional[Dict]:
     Returns:
         Normalized block dict or None if invalid
     """
+    # Fast path: a {type: "text", text: ...} block is already canonical
+    if type(block) is dict and len(block) == 2 and "text" in block \
+            and block.get("type") == BLOCK_TYPE_TEXT:
+        return block
+
     if block is None:
         return None
 
@@ -246,13 +248,12 @@ def extract_text_content(content: Any) -> str:
         return ""
 
     if isinstance(content, list):
-        texts = []
-        for block in content:
-            if isinstance(block, dict) and block.get("type") == BLOCK_TYPE_TEXT:
-                texts.append(block.get("text", ""))
-            elif isinstance(block, str):
-                texts.append(block)
-        return "\n".join(texts)
+        return "\n".join([
+            block if isinstance(block, str) else block.get("text", "")
+            for block in content
+            if isinstance(block, str)
+            or (isinstance(block, dict) and block.get("type") == BLOCK_TYPE_TEXT)
+        ])
 
     return str(content)
 
@@ -269,10 +270,7 @@ def has_special_blocks(content: Any) -> bool:
     if not isinstance(content, list):
         return False
 
-    for block in content:
-        if isinstance(block, dict):
-            block_type = block.get("type", BLOCK_TYPE_TEXT)
-            if block_type != BLOCK_TYPE_TEXT:
-                return True
-
-    return False
+    return any(
+        isinstance(block, dict) and block.get("type", BLOCK_TYPE_TEXT) != BLOCK_TYPE_TEXT
+        for block in content
+    )
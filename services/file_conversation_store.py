@@ -394,6 +394,23 @@ class FileConversationStore:
         shutil.rmtree(conv_path)
         return True
 
+    async def clear_all(self) -> int:
+        """Delete every conversation, keeping the storage directory.
+
+        Returns:
+            Number of conversations removed
+        """
+        if not self.base_path.exists():
+            return 0
+
+        import shutil
+        removed = 0
+        for conv_dir in self.base_path.iterdir():
+            if conv_dir.is_dir():
+                shutil.rmtree(conv_dir)
+                removed += 1
+        return removed
+
     # =========================================================================
     # Message Operations
     # =========================================================================
@@ -11,9 +11,22 @@ import uuid
 from typing import AsyncGenerator, Dict, Any, List, Optional
 
 
+_MOCK_LLM_TRUTHY = frozenset({"1", "true", "yes"})
+
+
 def is_mock_mode() -> bool:
     """Check if mock mode is enabled via environment variable."""
-    return os.getenv("MOCK_LLM", "").lower() in ("1", "true", "yes")
+    value = os.environ.get("MOCK_LLM")
+    return value is not None and value.lower() in _MOCK_LLM_TRUTHY
+
+
+async def _pause(delay_ms: float) -> None:
+    """Pause between mock events.
+
+    Delays of 1ms or less are below timer resolution, so these just yield to
+    the event loop instead of scheduling a timer.
+    """
+    await asyncio.sleep(delay_ms / 1000 if delay_ms > 1 else 0)
 
 
 # ============================================================================
@@ -93,6 +106,21 @@ MOCK_SURFACE_CONTENT = {
 </div>"""
 }
 
+# Pre-built events. Consumers only read events, so the fixed ones are built
+# once here and shared by every stream
+DONE_EVENT = {"type": "done"}
+STOPPED_EVENT = {"type": "stopped", "content": "Stream stopped by user"}
+MOCK_THINKING_EVENTS = [
+    {"type": "thinking", "content": chunk + "\n"} for chunk in MOCK_THINKING_CONTENT.split('\n')
+]
+MOCK_WEB_SEARCH_QUERY_EVENTS = [
+    {"type": "web_search_query", "partial_query": part} for part in ("testing ", "chat ", "interface")
+]
+MOCK_TEXT_EVENTS = [{"type": "text", "content": chunk} for chunk in MOCK_TEXT_CHUNKS]
+MOCK_TOOL_USE_EVENT = {"type": "tool_use", **MOCK_TOOL_USE}
+MOCK_TOOL_RESULT_EVENT = {"type": "tool_result", **MOCK_TOOL_RESULT}
+MOCK_SURFACE_CONTENT_EVENT = {"type": "surface_content", **MOCK_SURFACE_CONTENT}
+
 
 # ============================================================================
 # Mock Normal Chat Stream
@@ -121,14 +149,13 @@ async def mock_normal_chat_stream(
     # Emit message_id first
     if message_id:
         yield {"type": "message_id", "id": message_id, "position": position}
-        await asyncio.sleep(delay_ms / 1000)
+        await _pause(delay_ms)
 
     # Emit thinking if enabled
     if thinking_enabled:
-        thinking_chunks = MOCK_THINKING_CONTENT.split('\n')
-        for chunk in thinking_chunks:
-            yield {"type": "thinking", "content": chunk + "\n"}
-            await asyncio.sleep(delay_ms / 1000)
+        for event in MOCK_THINKING_EVENTS:
+            yield event
+            await _pause(delay_ms)
 
     # Emit web search if enabled
     if web_search_enabled:
@@ -136,13 +163,12 @@ async def mock_normal_chat_stream(
 
         # Search start
         yield {"type": "web_search_start", "id": search_id}
-        await asyncio.sleep(delay_ms / 1000)
+        await _pause(delay_ms)
 
         # Query partials
-        query_parts = ["testing ", "chat ", "interface"]
-        for part in query_parts:
-            yield {"type": "web_search_query", "partial_query": part}
-            await asyncio.sleep(delay_ms / 1000)
+        for event in MOCK_WEB_SEARCH_QUERY_EVENTS:
+            yield event
+            await _pause(delay_ms)
 
         # Results
         yield {
@@ -150,15 +176,15 @@ async def mock_normal_chat_stream(
             "tool_use_id": search_id,
             "results": MOCK_WEB_SEARCH_RESULTS
         }
-        await asyncio.sleep(delay_ms / 1000)
+        await _pause(delay_ms)
 
     # Emit text chunks
-    for chunk in MOCK_TEXT_CHUNKS:
-        yield {"type": "text", "content": chunk}
-        await asyncio.sleep(delay_ms / 1000)
+    for event in MOCK_TEXT_EVENTS:
+        yield event
+        await _pause(delay_ms)
 
     # Done
-    yield {"type": "done"}
+    yield DONE_EVENT
 
 
 # ============================================================================
@@ -171,6 +197,28 @@ Let me consider the best approach to help with this task.
 I should use the available tools to accomplish this efficiently.
 """
 
+MOCK_AGENT_THINKING_EVENTS = [
+    {"type": "thinking", "content": chunk + "\n"}
+    for chunk in MOCK_AGENT_THINKING_CONTENT.split('\n')
+]
+MOCK_AGENT_INITIAL_TEXT_EVENTS = [
+    {"type": "text", "content": chunk}
+    for chunk in ["I'll help you with that. ", "Let me ", "check some files first.\n\n"]
+]
+MOCK_AGENT_POST_TOOL_TEXT_EVENTS = [
+    {"type": "text", "content": chunk}
+    for chunk in [
+        "\n\nI found the file. ",
+        "Here's what I discovered:\n\n",
+        "The file contains **mock data** ",
+        "for testing purposes.\n"
+    ]
+]
+MOCK_AGENT_FINAL_TEXT_EVENTS = [
+    {"type": "text", "content": chunk}
+    for chunk in ["\n\nLet me know if you need ", "anything else!"]
+]
+
 
 async def mock_agent_chat_stream(
     conversation_id: Optional[str],
@@ -202,102 +250,77 @@ async def mock_agent_chat_stream(
     # Emit message_id
     if message_id:
         yield {"type": "message_id", "id": message_id}
-        await asyncio.sleep(delay_ms / 1000)
+        await _pause(delay_ms)
 
     if check_stopped():
-        yield {"type": "stopped", "content": "Stream stopped by user"}
+        yield STOPPED_EVENT
         return
 
     # Emit session_id
     yield {"type": "session_id", "session_id": session_id}
-    await asyncio.sleep(delay_ms / 1000)
+    await _pause(delay_ms)
 
     if check_stopped():
-        yield {"type": "stopped", "content": "Stream stopped by user"}
+        yield STOPPED_EVENT
         return
 
     # Emit thinking if enabled
     if include_thinking:
-        thinking_chunks = MOCK_AGENT_THINKING_CONTENT.split('\n')
-        for chunk in thinking_chunks:
+        for event in MOCK_AGENT_THINKING_EVENTS:
             if check_stopped():
-                yield {"type": "stopped", "content": "Stream stopped by user"}
+                yield STOPPED_EVENT
                 return
-            yield {"type": "thinking", "content": chunk + "\n"}
-            await asyncio.sleep(delay_ms / 1000)
+            yield event
+            await _pause(delay_ms)
 
     # Initial text
-    initial_text = ["I'll help you with that. ", "Let me ", "check some files first.\n\n"]
-    for chunk in initial_text:
+    for event in MOCK_AGENT_INITIAL_TEXT_EVENTS:
         if check_stopped():
-            yield {"type": "stopped", "content": "Stream stopped by user"}
+            yield STOPPED_EVENT
             return
-        yield {"type": "text", "content": chunk}
-        await asyncio.sleep(delay_ms / 1000)
+        yield event
+        await _pause(delay_ms)
 
     # Tool use
     if include_tool_use:
         if check_stopped():
-            yield {"type": "stopped", "content": "Stream stopped by user"}
+            yield STOPPED_EVENT
             return
-        yield {
-            "type": "tool_use",
-            "id": MOCK_TOOL_USE["id"],
-            "name": MOCK_TOOL_USE["name"],
-            "input": MOCK_TOOL_USE["input"]
-        }
-        await asyncio.sleep(delay_ms * 2 / 1000)  # Slightly longer delay for tool
+        yield MOCK_TOOL_USE_EVENT
+        await _pause(delay_ms * 2)  # Slightly longer delay for tool
 
         if check_stopped():
-            yield {"type": "stopped", "content": "Stream stopped by user"}
+            yield STOPPED_EVENT
             return
-        yield {
-            "type": "tool_result",
-            "tool_use_id": MOCK_TOOL_RESULT["tool_use_id"],
-            "content": MOCK_TOOL_RESULT["content"],
-            "is_error": MOCK_TOOL_RESULT["is_error"]
-        }
-        await asyncio.sleep(delay_ms / 1000)
+        yield MOCK_TOOL_RESULT_EVENT
+        await _pause(delay_ms)
 
     # More text after tool
-    post_tool_text = [
-        "\n\nI found the file. ",
-        "Here's what I discovered:\n\n",
-        "The file contains **mock data** ",
-        "for testing purposes.\n"
-    ]
-    for chunk in post_tool_text:
+    for event in MOCK_AGENT_POST_TOOL_TEXT_EVENTS:
         if check_stopped():
-            yield {"type": "stopped", "content": "Stream stopped by user"}
+            yield STOPPED_EVENT
             return
-        yield {"type": "text", "content": chunk}
-        await asyncio.sleep(delay_ms / 1000)
+        yield event
+        await _pause(delay_ms)
 
     # Surface content
     if include_surface:
         if check_stopped():
-            yield {"type": "stopped", "content": "Stream stopped by user"}
+            yield STOPPED_EVENT
             return
-        yield {
-            "type": "surface_content",
-            "content_id": MOCK_SURFACE_CONTENT["content_id"],
-            "content_type": MOCK_SURFACE_CONTENT["content_type"],
-            "title": MOCK_SURFACE_CONTENT["title"],
-            "content": MOCK_SURFACE_CONTENT["content"]
-        }
-        await asyncio.sleep(delay_ms / 1000)
+        yield MOCK_SURFACE_CONTENT_EVENT
+        await _pause(delay_ms)
 
     # Final text
-    final_text = ["\n\nLet me know if you need ", "anything else!"]
-    for chunk in final_text:
+    for event in MOCK_AGENT_FINAL_TEXT_EVENTS:
         if check_stopped():
-            yield {"type": "stopped", "content": "Stream stopped by user"}
+            yield STOPPED_EVENT
             return
-        yield {"type": "text", "content": chunk}
-        await asyncio.sleep(delay_ms / 1000)
+        yield event
+        await _pause(delay_ms)
 
     # Done
-    yield {"type": "done"}
+    yield DONE_EVENT
 
 
 # ============================================================================
@@ -318,5 +341,5 @@ async def mock_error_stream(
         A few text events followed by an error
     """
     yield {"type": "text", "content": "Starting response... "}
-    await asyncio.sleep(delay_before_error_ms / 1000)
+    await _pause(delay_before_error_ms)
     yield {"type": "error", "content": error_message}
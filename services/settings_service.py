@@ -4,8 +4,44 @@ This service provides a single source of truth for resolving settings
 across different levels: defaults -> project -> conversation.
 """
 
-from typing import Dict, Any, Optional
-from api.settings import load_default_settings, get_project_settings
+import copy
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, Optional, Tuple
+from api.settings import load_default_settings, get_project_settings, settings_files_version
+
+
+@lru_cache(maxsize=128)
+def _resolve_cached(
+    project_id: Optional[str],
+    conversation_items: FrozenSet[Tuple[str, Any]],
+    files_version: tuple
+) -> Dict[str, Any]:
+    """Merge defaults, project and (pre-filtered) conversation settings.
+
+    Cached per (project_id, conversation settings, settings_files_version());
+    the version only keys the cache, so a rewritten settings file misses it.
+    Callers must not mutate the returned dict.
+    """
+    return _merge_settings(project_id, dict(conversation_items))
+
+
+def _merge_settings(
+    project_id: Optional[str],
+    conversation_settings: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Merge defaults < project < conversation, skipping None values."""
+    # Only non-None project values override the defaults
+    project_settings = {
+        k: v for k, v in get_project_settings(project_id).items() if v is not None
+    } if project_id else {}
+
+    # One new dict; the loaded defaults are left untouched
+    return load_default_settings() | project_settings | conversation_settings
+
+
+def clear_settings_cache() -> None:
+    """Drop cached resolutions; call after default or project settings change."""
+    _resolve_cached.cache_clear()
 
 
 class SettingsService:
@@ -49,22 +85,25 @@ class SettingsService:
             mode: "normal" or "agent" - determines which settings keys to use
 
         Returns:
-            Resolved settings dictionary with all applicable settings
+            Resolved settings dictionary with all applicable settings; the
+            caller owns it. Resolutions are cached until the default or
+            project settings files change on disk (or clear_settings_cache()
+            is called).
         """
-        # Start with default settings
-        resolved = load_default_settings()
-
-        # Override with project settings if available
-        if project_id:
-            project_settings = get_project_settings(project_id)
-            # Only update with non-None values
-            resolved.update({k: v for k, v in project_settings.items() if v is not None})
+        conversation_overrides = {
+            k: v for k, v in (conversation_settings or {}).items() if v is not None
+        }
 
-        # Override with conversation settings if available
-        if conversation_settings:
-            resolved.update({k: v for k, v in conversation_settings.items() if v is not None})
+        try:
+            cached = _resolve_cached(
+                project_id, frozenset(conversation_overrides.items()), settings_files_version()
+            )
+        except TypeError:
+            # Unhashable values (e.g. an agent_tools dict) can't be cached
+            return _merge_settings(project_id, conversation_overrides)
 
-        return resolved
+        # Deep copy so callers can't reach into nested cached values
+        return copy.deepcopy(cached)
 
     def resolve_agent_settings(
         self,
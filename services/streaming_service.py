@@ -26,9 +26,9 @@ class SteerContext:
     created_at: float = field(default_factory=time.time)
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamState:
-    """State of an active stream."""
+    """State of an active stream (slotted; one is kept per active stream)."""
     stream_type: StreamType
     stop_event: Optional[asyncio.Event] = None  # Only for AGENT streams
     # Task tracking fields
@@ -105,14 +105,18 @@ class StreamingService:
         Returns:
             Dict with streaming status and capabilities
         """
-        if conversation_id not in self._streams:
+        state = self._streams.get(conversation_id)
+        if state is None:
             return {
                 "streaming": False,
                 "type": None,
                 "stoppable": False
             }
+        return self._active_status(state)
 
-        state = self._streams[conversation_id]
+    @staticmethod
+    def _active_status(state: StreamState) -> Dict:
+        """Build the status dict for a registered stream."""
         return {
             "streaming": True,
             "type": state.stream_type.value,
@@ -144,9 +148,10 @@ class StreamingService:
         Returns:
             Dict mapping conversation_id to status dict
         """
+        active_status = self._active_status
         return {
-            conv_id: self.get_status(conv_id)
-            for conv_id in self._streams
+            conv_id: active_status(state)
+            for conv_id, state in self._streams.items()
         }
 
     def get_active_tasks(self) -> List[Dict[str, Any]]:
@@ -0,0 +1,28 @@
+"""Server setup shared by the test_surface_* scripts."""
+
+import os
+import socket
+import subprocess
+
+
+def pick_port() -> int:
+    """Port for the test server: SURFACE_TEST_PORT if set, else a free one.
+
+    Asking the OS for a free port lets several surface scripts run side by
+    side without colliding on a fixed port.
+    """
+    if "SURFACE_TEST_PORT" in os.environ:
+        return int(os.environ["SURFACE_TEST_PORT"])
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("", 0))
+        return sock.getsockname()[1]
+
+
+def stop_server(server_process: subprocess.Popen, timeout: float = 5) -> None:
+    """Terminate the test server, killing it if it outlives the timeout."""
+    print("\nStopping server...")
+    server_process.terminate()
+    try:
+        server_process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        server_process.kill()
@@ -7,6 +7,7 @@ Tests:
 2. Memory API endpoints
 3. Project-based memory sharing
 4. Security (path traversal prevention)
+5. Memory and surface MCP servers over stdio (JSON-RPC framing, batches, errors)
 
 Usage:
     python test_memory.py
@@ -389,12 +390,24 @@ def test_mcp_protocol():
             text=True
         )
 
-        def send_request(request):
-            proc.stdin.write(json.dumps(request) + '\n')
+        def send_line(line):
+            proc.stdin.write(line + '\n')
             proc.stdin.flush()
             response = proc.stdout.readline()
             return json.loads(response) if response else None
 
+        def send_request(request):
+            return send_line(json.dumps(request))
+
+        def call_tool(request_id, name, arguments):
+            resp = send_request({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "tools/call",
+                "params": {"name": name, "arguments": arguments}
+            })
+            return resp.get('result', {}).get('content', [{}])[0].get('text', '')
+
         try:
             # Test 1: Initialize
             resp = send_request({
@@ -471,10 +484,239 @@ def test_mcp_protocol():
             results.append(passed)
             print_test("MCP unknown tool returns error", passed)
 
+            # Test 6: Malformed JSON gets a parse error and the server keeps going
+            resp = send_line('{"jsonrpc": "2.0", "id": 6,')
+            passed = resp and resp.get('error', {}).get('code') == -32700 and resp.get('id') is None
+            results.append(passed)
+            print_test("MCP parse error", passed, str(resp) if not passed else "")
+
+            # Test 7: A non-string method is answered, not fatal
+            resp = send_line('{"jsonrpc": "2.0", "id": 7, "method": ["x"]}')
+            passed = resp and resp.get('id') == 7 and resp.get('error', {}).get('code') == -32601
+            results.append(passed)
+            print_test("MCP non-string method returns method not found", passed, str(resp) if not passed else "")
+
+            # Test 8: Batch of requests gets one array of responses
+            resp = send_request([
+                {"jsonrpc": "2.0", "id": 81, "method": "tools/list"},
+                {"jsonrpc": "2.0", "method": "notifications/initialized"},
+                {"jsonrpc": "2.0", "id": 82, "method": "tools/call",
+                 "params": {"name": "memory_view", "arguments": {"path": "/memories/mcp_test.txt"}}},
+            ])
+            passed = (isinstance(resp, list) and [r.get('id') for r in resp] == [81, 82]
+                      and 'MCP test content' in resp[1]['result']['content'][0]['text'])
+            results.append(passed)
+            print_test("MCP batch", passed, str(resp)[:200] if not passed else "")
+
+            # Test 9: Empty batch is a single invalid request error
+            resp = send_request([])
+            passed = resp and resp.get('error', {}).get('code') == -32600
+            results.append(passed)
+            print_test("MCP empty batch", passed, str(resp) if not passed else "")
+
+            # Test 10: A notification-only batch gets no response at all, so
+            # the next line read answers the request after it
+            proc.stdin.write(json.dumps([{"jsonrpc": "2.0", "method": "notifications/initialized"}]) + '\n')
+            resp = send_request({"jsonrpc": "2.0", "id": 10, "method": "tools/list"})
+            passed = resp and resp.get('id') == 10
+            results.append(passed)
+            print_test("MCP notification-only batch is silent", passed, str(resp)[:200] if not passed else "")
+
+            # Test 11: A non-object batch entry is an invalid request in the array
+            resp = send_request([1, {"jsonrpc": "2.0", "id": 11, "method": "tools/list"}])
+            passed = (isinstance(resp, list)
+                      and resp[0] == {"jsonrpc": "2.0", "id": None,
+                                      "error": {"code": -32600, "message": "Invalid Request"}}
+                      and resp[1].get('id') == 11)
+            results.append(passed)
+            print_test("MCP invalid request in batch", passed, str(resp)[:200] if not passed else "")
+
+            # Test 12: View range on a file large enough for the mmap path;
+            # only LF (and CRLF) end lines there
+            filler = 'x' * 99 + '\n'
+            big_text = 'first\rstill first\nsecond\r\nthird\n' + filler * (9 * 1024 * 1024 // len(filler))
+            (Path(tmpdir) / 'big.txt').write_text(big_text, newline='')
+            content = call_tool(12, "memory_view", {"path": "/memories/big.txt", "view_range": [1, 3]})
+            passed = content.split('\n')[1:] == [
+                '     1\tfirst\rstill first', '     2\tsecond', '     3\tthird'
+            ]
+            results.append(passed)
+            print_test("MCP memory_view range on large file", passed, repr(content[:200]) if not passed else "")
+
+            last = big_text.count('\n')
+            content = call_tool(13, "memory_view", {"path": "/memories/big.txt", "view_range": [last, last]})
+            passed = content.split('\n')[1:] == ['%6d\t%s' % (last, 'x' * 99)]
+            results.append(passed)
+            print_test("MCP memory_view range at end of large file", passed, repr(content[:200]) if not passed else "")
+
+            # Test 13: Directory listings follow creates, renames and deletes
+            call_tool(14, "memory_view", {"path": "/memories"})
+            call_tool(15, "memory_create", {"path": "/memories/listed.txt", "file_text": "x"})
+            listing = call_tool(16, "memory_view", {"path": "/memories"})
+            passed = 'listed.txt' in listing
+            call_tool(17, "memory_rename", {"old_path": "/memories/listed.txt", "new_path": "/memories/renamed.txt"})
+            listing = call_tool(18, "memory_view", {"path": "/memories"})
+            passed = passed and 'renamed.txt' in listing and 'listed.txt' not in listing
+            call_tool(19, "memory_delete", {"path": "/memories/renamed.txt"})
+            listing = call_tool(20, "memory_view", {"path": "/memories"})
+            passed = passed and 'renamed.txt' not in listing
+            results.append(passed)
+            print_test("MCP directory listing follows changes", passed, listing if not passed else "")
+
         finally:
             proc.terminate()
             proc.wait(timeout=5)
 
+        # Test 14: The server exits once its output is closed, even with
+        # more requests queued than the pipeline holds
+        proc = subprocess.Popen(
+            ['python3', str(server_path), '--memory-path', tmpdir],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        proc.stdout.close()
+        view_line = json.dumps({
+            "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": "memory_view", "arguments": {"path": "/memories"}}
+        }).encode() + b'\n'
+        try:
+            proc.stdin.write(view_line * 300)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            proc.wait(timeout=10)
+            passed = b'Traceback' not in proc.stderr.read()
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            passed = False
+        proc.stderr.close()
+        results.append(passed)
+        print_test("MCP server exits when stdout is closed", passed)
+
+    return all(results), results
+
+
+def test_surface_mcp_protocol():
+    """Test the JSON-RPC protocol and script runner of the surface server."""
+    print_header("Testing Surface MCP Protocol")
+
+    from tools.surface_mcp_server import SurfaceServer, decode_output, spawn_script
+
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+        server_path = Path(__file__).parent / 'tools' / 'surface_mcp_server.py'
+
+        proc = subprocess.Popen(
+            ['python3', str(server_path), '--workspace-path', tmpdir, '--conversation-id', 'conv-test'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        def send_line(line):
+            proc.stdin.write(line + b'\n')
+            proc.stdin.flush()
+            response = proc.stdout.readline()
+            return json.loads(response) if response else None
+
+        def send_request(request):
+            return send_line(json.dumps(request).encode())
+
+        try:
+            # Test 1: A line over the 16 MiB limit is rejected, then the
+            # server answers the next request as usual
+            resp = send_line(b'{"jsonrpc": "2.0", "id": 1, "pad": "' + b'x' * (17 * 1024 * 1024) + b'"}')
+            passed = resp and resp.get('error', {}).get('code') == -32700 and resp.get('id') is None
+            resp = send_request({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+            passed = passed and resp and resp.get('id') == 2
+            results.append(passed)
+            print_test("Surface oversized frame returns parse error", passed, str(resp)[:200] if not passed else "")
+
+            # Test 2: surface_from_file output survives the pre-encoded envelope
+            html = '<p class="a\\b">caf\u00e9 \u2028 "quoted" \\n</p>\n\t\x01'
+            (workspace / 'page.html').write_text(html, newline='')
+            resp = send_request({
+                "jsonrpc": "2.0",
+                "id": "call-\"3\"",
+                "method": "tools/call",
+                "params": {"name": "surface_from_file",
+                           "arguments": {"filename": "page.html", "content_type": "html", "title": 'T "1"'}}
+            })
+            result = resp.get('result', {})
+            surfaced = json.loads(result.get('content', [{}])[0].get('text', '{}'))
+            passed = (resp.get('id') == 'call-"3"' and result.get('isError') is False
+                      and surfaced.get('content') == html and surfaced.get('title') == 'T "1"')
+            results.append(passed)
+            print_test("Surface tools/call result round-trips", passed, str(resp)[:200] if not passed else "")
+
+            # Test 3: Batches are answered as one array; a non-object entry
+            # is an invalid request
+            resp = send_request([
+                {"jsonrpc": "2.0", "id": 41, "method": "tools/list"},
+                {"jsonrpc": "2.0", "method": "notifications/initialized"},
+                7,
+                {"jsonrpc": "2.0", "id": 42, "method": "bogus"},
+            ])
+            passed = (isinstance(resp, list) and [r.get('id') for r in resp] == [41, None, 42]
+                      and resp[1].get('error') == {"code": -32600, "message": "Invalid Request"})
+            results.append(passed)
+            print_test("Surface batch", passed, str(resp)[:200] if not passed else "")
+
+        finally:
+            proc.terminate()
+            proc.wait(timeout=5)
+
+        # Test 4: Scripts forked from the zygote or spawned directly behave
+        # like a fresh python3
+        script = workspace / 'report.py'
+        script.write_text(
+            'import atexit, sys, threading, time\n'
+            'atexit.register(lambda: print("atexit ran"))\n'
+            'def late():\n'
+            '    time.sleep(0.1)\n'
+            '    print("thread ran")\n'
+            'threading.Thread(target=late).start()\n'
+            'print("<b>out</b>", sys.argv[1:])\n'
+            'print("to stderr", file=sys.stderr)\n'
+            'if sys.argv[1:] == ["fail"]:\n'
+            '    raise ValueError("boom")\n'
+        )
+        server = SurfaceServer(tmpdir, 'conv-test')
+        try:
+            for args in ([], ['fail']):
+                cmd = ['python3', str(script.resolve()), *args]
+                plain = subprocess.run(cmd, capture_output=True, text=True, cwd=tmpdir)
+                expected = (plain.returncode, plain.stdout, plain.stderr)
+
+                via_zygote = server._run_script(cmd)
+                passed = server._zygote is not None and via_zygote == expected
+                results.append(passed)
+                print_test(f"Surface zygote run matches python3 {' '.join(args)}".rstrip(), passed,
+                           f"{via_zygote!r} vs {expected!r}" if not passed else "")
+
+                # spawn_script runs in the current directory, as the server
+                # does after chdir-ing into the workspace
+                old_cwd = os.getcwd()
+                os.chdir(tmpdir)
+                try:
+                    returncode, stdout, stderr = spawn_script(cmd, 30)
+                finally:
+                    os.chdir(old_cwd)
+                via_spawn = (returncode, decode_output(stdout), decode_output(stderr))
+                passed = via_spawn == expected
+                results.append(passed)
+                print_test(f"Surface spawned run matches python3 {' '.join(args)}".rstrip(), passed,
+                           f"{via_spawn!r} vs {expected!r}" if not passed else "")
+        finally:
+            if server._zygote is not None:
+                server._zygote.close()
+            server.flush_writes()
+
     return all(results), results
 
 
@@ -760,6 +1002,7 @@ def main():
             ("Memory API Endpoints", test_memory_api),
             ("Memory Sharing", test_memory_sharing),
             ("MCP Protocol", test_mcp_protocol),
+            ("Surface MCP Protocol", test_surface_mcp_protocol),
             ("Agent Memory Handoff", test_agent_memory_handoff),
         ]
 
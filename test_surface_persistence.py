@@ -4,7 +4,6 @@
 import asyncio
 import subprocess
 import sys
-import os
 import json
 from pathlib import Path
 
@@ -13,8 +12,74 @@ try:
 except ImportError:
     sys.exit(1)
 
+from surface_test_server import pick_port, stop_server
+
 SCREENSHOTS_DIR = Path(__file__).parent / "screenshots" / "surface_persistence"
-SERVER_URL = "http://localhost:8080"
+SERVER_PORT = pick_port()
+SERVER_URL = f"http://localhost:{SERVER_PORT}"
+
+SURFACE_FILENAME = "surface_test123.html"
+SURFACE_HTML = """
+<style>
+    .test-data { padding: 20px; }
+    h2 { color: #333; margin-bottom: 20px; }
+    .status { padding: 10px; background: #d4edda; border-radius: 4px; }
+</style>
+<div class="test-data">
+    <h2>Persisted Dashboard</h2>
+    <p>This content was saved to disk and loaded on page reload.</p>
+    <div class="status">Status: Active</div>
+</div>
+"""
+# Response bodies for the stubbed routes, encoded once per run
+SURFACE_HTML_BODY = SURFACE_HTML.encode()
+SURFACE_JSON_BODY = json.dumps({"content": SURFACE_HTML}).encode()
+
+# Static JS sources - parameters go in through page.evaluate's argument
+LOAD_SURFACE_JS = """
+    async ({ convId, fname }) => {
+        const response = await fetch(`/api/agent-chat/surface-content/${convId}/${fname}`);
+        if (!response.ok) return { error: response.status };
+        return await response.json();
+    }
+"""
+
+RENDER_SURFACE_JS = """
+    async (fname) => {
+        const { cm, mc } = window.__t;
+
+        // Create a placeholder
+        const placeholder = cm.createSurfaceContentPlaceholder(
+            'html',
+            'Persisted Dashboard',
+            'test123'
+        );
+        mc.appendChild(placeholder);
+
+        // Load content from server
+        await cm.loadSurfaceContent(
+            placeholder,
+            fname,
+            'html',
+            'Persisted Dashboard',
+            'test123'
+        );
+
+        // Wait a bit for content to load
+        await new Promise(r => setTimeout(r, 500));
+
+        // Check if it was replaced with real content
+        const blocks = document.querySelectorAll('.surface-content-block');
+        const lastBlock = blocks[blocks.length - 1];
+
+        return {
+            blockCount: blocks.length,
+            hasIframe: !!lastBlock.querySelector('iframe'),
+            isLoading: lastBlock.classList.contains('surface-loading'),
+            className: lastBlock.className
+        };
+    }
+"""
 
 
 async def run_test():
@@ -22,9 +87,9 @@ async def run_test():
 
     print("Starting server...")
     server_process = subprocess.Popen(
-        [sys.executable, "-m", "uvicorn", "app:app", "--host", "0.0.0.0", "--port", "8080"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "0.0.0.0", "--port", str(SERVER_PORT)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
         cwd=Path(__file__).parent
     )
 
@@ -33,7 +98,26 @@ async def run_test():
 
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(viewport={"width": 1400, "height": 900})
+            context = await browser.new_context(
+                viewport={"width": 1400, "height": 900},
+                bypass_csp=True,
+            )
+            # Test hooks are in place before any app script runs
+            await context.add_init_script("window.__TEST_MODE__ = true;")
+            # Serve the surface file from memory - the frontend loader is what's
+            # under test here, not the backend file endpoints
+            await context.route(
+                f"**/api/agent-chat/surface-content/*/{SURFACE_FILENAME}",
+                lambda route: route.fulfill(
+                    status=200,
+                    content_type="application/json",
+                    body=SURFACE_JSON_BODY,
+                ),
+            )
+            await context.route(
+                f"**/api/agent-chat/workspace/*/{SURFACE_FILENAME}",
+                lambda route: route.fulfill(status=200, content_type="text/html", body=SURFACE_HTML_BODY),
+            )
             page = await context.new_page()
 
             await page.goto(SERVER_URL)
@@ -44,48 +128,32 @@ async def run_test():
             await page.click("#new-agent-chat-btn")
             await asyncio.sleep(0.5)
 
-            # Get the conversation ID
+            # Cache the handles used by later steps, and get the conversation ID
             conversation_id = await page.evaluate("""
-                () => ConversationsManager?.getCurrentConversationId()
+                () => {
+                    window.__t = {
+                        cm: ChatManager,
+                        mc: document.getElementById('messages-container'),
+                        conv: ConversationsManager?.getCurrentConversationId()
+                    };
+                    return window.__t.conv;
+                }
             """)
             print(f"   Conversation ID: {conversation_id}")
 
-            # Simulate what backend does: save surface content to file
-            print("\n2. Simulating backend saving surface content to disk...")
-            workspace_dir = Path(__file__).parent / "data" / "conversations" / conversation_id / "workspace"
-            workspace_dir.mkdir(parents=True, exist_ok=True)
+            # Surface content is served by the routes registered above
+            print("\n2. Serving surface content from memory (backend stubbed)...")
 
-            surface_html = """
-<style>
-    .test-data { padding: 20px; }
-    h2 { color: #333; margin-bottom: 20px; }
-    .status { padding: 10px; background: #d4edda; border-radius: 4px; }
-</style>
-<div class="test-data">
-    <h2>Persisted Dashboard</h2>
-    <p>This content was saved to disk and loaded on page reload.</p>
-    <div class="status">Status: Active</div>
-</div>
-"""
-            surface_file = workspace_dir / "surface_test123.html"
-            with open(surface_file, 'w') as f:
-                f.write(surface_html)
-            print(f"   Saved content to: {surface_file}")
-
-            # Now simulate the message being saved with reference to the file
-            # We'll inject a message into the messages array that references this file
-            print("\n3. Testing surface content API endpoint...")
-            api_result = await page.evaluate(f"""
-                async () => {{
-                    const response = await fetch('/api/agent-chat/surface-content/{conversation_id}/surface_test123.html');
-                    if (!response.ok) return {{ error: response.status }};
-                    return await response.json();
-                }}
-            """)
+            # Sanity-check the stub the loader will hit; this doesn't exercise
+            # the backend endpoint
+            print("\n3. Checking the stubbed surface content route...")
+            api_result = await page.evaluate(
+                LOAD_SURFACE_JS, {"convId": conversation_id, "fname": SURFACE_FILENAME}
+            )
             print(f"   API result: {api_result}")
 
             if 'content' in api_result:
-                print("   Content loaded successfully from API!")
+                print("   Stubbed route returned the content")
                 content_preview = api_result['content'][:100]
                 print(f"   Content preview: {content_preview}...")
             else:
@@ -93,40 +161,7 @@ async def run_test():
 
             # Test rendering a surface block that references a file
             print("\n4. Testing surface block with file reference...")
-            render_result = await page.evaluate(f"""
-                async () => {{
-                    // Create a placeholder
-                    const placeholder = ChatManager.createSurfaceContentPlaceholder(
-                        'html',
-                        'Persisted Dashboard',
-                        'test123'
-                    );
-                    document.getElementById('messages-container').appendChild(placeholder);
-
-                    // Load content from server
-                    await ChatManager.loadSurfaceContent(
-                        placeholder,
-                        'surface_test123.html',
-                        'html',
-                        'Persisted Dashboard',
-                        'test123'
-                    );
-
-                    // Wait a bit for content to load
-                    await new Promise(r => setTimeout(r, 500));
-
-                    // Check if it was replaced with real content
-                    const blocks = document.querySelectorAll('.surface-content-block');
-                    const lastBlock = blocks[blocks.length - 1];
-
-                    return {{
-                        blockCount: blocks.length,
-                        hasIframe: !!lastBlock.querySelector('iframe'),
-                        isLoading: lastBlock.classList.contains('surface-loading'),
-                        className: lastBlock.className
-                    }};
-                }}
-            """)
+            render_result = await page.evaluate(RENDER_SURFACE_JS, SURFACE_FILENAME)
             print(f"   Render result: {render_result}")
 
             await asyncio.sleep(0.5)
@@ -153,25 +188,24 @@ async def run_test():
             await page.keyboard.press('Escape')
             await asyncio.sleep(0.3)
 
-            await browser.close()
+            # Stop the server while Chromium shuts down
+            await asyncio.gather(
+                asyncio.to_thread(stop_server, server_process),
+                browser.close(),
+            )
 
         print("\n" + "=" * 50)
         print("SURFACE PERSISTENCE TEST COMPLETE")
         print("=" * 50)
-        print("\nWorkflow verified:")
-        print("1. Surface content saved to workspace/surface_*.html")
-        print("2. Message stores reference (filename) not full content")
-        print("3. On page load, content fetched via API")
-        print("4. Content renders and modal still works")
+        print("\nFrontend loader verified (backend file endpoints are stubbed):")
+        print("1. A placeholder block references the surface file by name")
+        print("2. loadSurfaceContent fetches the file and replaces the placeholder")
+        print("3. Content renders and modal still works")
         return True
 
     finally:
-        print("\nStopping server...")
-        server_process.terminate()
-        try:
-            server_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            server_process.kill()
+        if server_process.poll() is None:
+            stop_server(server_process)
 
 
 if __name__ == "__main__":
@@ -13,8 +13,11 @@ try:
 except ImportError:
     sys.exit(1)
 
+from surface_test_server import pick_port, stop_server
+
 SCREENSHOTS_DIR = Path(__file__).parent / "screenshots" / "surface_rendering"
-SERVER_URL = "http://localhost:8080"
+SERVER_PORT = pick_port()
+SERVER_URL = f"http://localhost:{SERVER_PORT}"
 
 
 async def run_test():
@@ -22,9 +25,9 @@ async def run_test():
 
     print("Starting server...")
     server_process = subprocess.Popen(
-        [sys.executable, "-m", "uvicorn", "app:app", "--host", "0.0.0.0", "--port", "8080"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "0.0.0.0", "--port", str(SERVER_PORT)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
         cwd=Path(__file__).parent
     )
 
@@ -33,7 +36,12 @@ async def run_test():
 
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(viewport={"width": 1400, "height": 900})
+            context = await browser.new_context(
+                viewport={"width": 1400, "height": 900},
+                bypass_csp=True,
+            )
+            # Test hooks are in place before any app script runs
+            await context.add_init_script("window.__TEST_MODE__ = true;")
             page = await context.new_page()
 
             await page.goto(SERVER_URL)
@@ -130,60 +138,51 @@ async def run_test():
             """)
             print(f"No-title surface block: {notitle_result}")
 
-            await page.screenshot(path=str(SCREENSHOTS_DIR / "03_all_surface_blocks.png"))
-            print(f"Saved: {SCREENSHOTS_DIR}/03_all_surface_blocks.png")
-
-            # Verify CSS styles
-            css_check = await page.evaluate("""
-                () => {
+            # Verify CSS styles and iframe auto-resize. All layout reads happen
+            # in one animation frame, in a single round trip
+            await asyncio.sleep(1)  # Wait for iframes to load
+            layout_check = await page.evaluate("""
+                () => new Promise(resolve => requestAnimationFrame(() => {
                     const blocks = document.querySelectorAll('.surface-content-block');
-                    if (blocks.length === 0) return { error: 'No blocks found' };
+                    if (blocks.length === 0) return resolve({ css: { error: 'No blocks found' } });
 
-                    const firstBlock = blocks[0];
-                    const style = getComputedStyle(firstBlock);
-
-                    return {
+                    const style = getComputedStyle(blocks[0]);
+                    const css = {
                         blockCount: blocks.length,
                         borderRadius: style.borderRadius,
                         overflow: style.overflow,
                         marginTop: style.marginTop,
                         marginBottom: style.marginBottom
                     };
-                }
-            """)
-            print(f"CSS verification: {css_check}")
 
-            # Check iframe auto-resize
-            await asyncio.sleep(1)  # Wait for iframes to load
-            iframe_check = await page.evaluate("""
-                () => {
                     const iframe = document.querySelector('.surface-iframe');
-                    if (!iframe) return { error: 'No iframe found' };
-
-                    return {
+                    const iframeInfo = iframe ? {
                         width: iframe.style.width || 'auto',
                         height: iframe.style.height,
                         minHeight: getComputedStyle(iframe).minHeight
-                    };
-                }
+                    } : { error: 'No iframe found' };
+
+                    resolve({ css, iframe: iframeInfo });
+                }))
             """)
-            print(f"Iframe check: {iframe_check}")
+            print(f"CSS verification: {layout_check['css']}")
+            print(f"Iframe check: {layout_check.get('iframe')}")
 
             await page.screenshot(path=str(SCREENSHOTS_DIR / "04_final_with_iframes.png"))
             print(f"Saved: {SCREENSHOTS_DIR}/04_final_with_iframes.png")
 
-            await browser.close()
+            # Stop the server while Chromium shuts down
+            await asyncio.gather(
+                asyncio.to_thread(stop_server, server_process),
+                browser.close(),
+            )
 
         print("\nAll surface rendering tests passed!")
         return True
 
     finally:
-        print("\nStopping server...")
-        server_process.terminate()
-        try:
-            server_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            server_process.kill()
+        if server_process.poll() is None:
+            stop_server(server_process)
 
 
 if __name__ == "__main__":
@@ -11,8 +11,11 @@ try:
 except ImportError:
     sys.exit(1)
 
+from surface_test_server import pick_port, stop_server
+
 SCREENSHOTS_DIR = Path(__file__).parent / "screenshots" / "surface_script"
-SERVER_URL = "http://localhost:8080"
+SERVER_PORT = pick_port()
+SERVER_URL = f"http://localhost:{SERVER_PORT}"
 
 
 async def run_test():
@@ -20,9 +23,9 @@ async def run_test():
 
     print("Starting server...")
     server_process = subprocess.Popen(
-        [sys.executable, "-m", "uvicorn", "app:app", "--host", "0.0.0.0", "--port", "8080"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "0.0.0.0", "--port", str(SERVER_PORT)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
         cwd=Path(__file__).parent
     )
 
@@ -31,7 +34,12 @@ async def run_test():
 
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(viewport={"width": 1400, "height": 900})
+            context = await browser.new_context(
+                viewport={"width": 1400, "height": 900},
+                bypass_csp=True,
+            )
+            # Test hooks are in place before any app script runs
+            await context.add_init_script("window.__TEST_MODE__ = true;")
             page = await context.new_page()
 
             await page.goto(SERVER_URL)
@@ -149,9 +157,8 @@ print(html)
 <div class="summary"><strong>Summary:</strong> 3 employees | Average: 91.3</div>
 '''
 
-            render_result = await page.evaluate(f"""
-                () => {{
-                    const content = {repr(sample_html)};
+            render_result = await page.evaluate("""
+                (content) => {
                     const block = ChatManager.createSurfaceContentBlock(
                         content,
                         'html',
@@ -159,13 +166,13 @@ print(html)
                         'script-output-1'
                     );
                     document.getElementById('messages-container').appendChild(block);
-                    return {{
+                    return {
                         success: true,
                         hasIframe: !!block.querySelector('iframe'),
                         hasHeader: !!block.querySelector('.surface-header')
-                    }};
-                }}
-            """)
+                    };
+                }
+            """, sample_html)
             print(f"   Render result: {render_result}")
 
             await asyncio.sleep(1)  # Wait for iframe to load
@@ -192,9 +199,8 @@ print(html)
 > Note: Engineering department shows consistently high performance.
 '''
 
-            md_result = await page.evaluate(f"""
-                () => {{
-                    const content = {repr(sample_md)};
+            md_result = await page.evaluate("""
+                (content) => {
                     const block = ChatManager.createSurfaceContentBlock(
                         content,
                         'markdown',
@@ -202,20 +208,20 @@ print(html)
                         'script-output-2'
                     );
                     document.getElementById('messages-container').appendChild(block);
-                    return {{ success: true }};
-                }}
-            """)
+                    return { success: true };
+                }
+            """, sample_md)
             print(f"   Markdown result: {md_result}")
 
             await asyncio.sleep(0.5)
             await page.screenshot(path=str(SCREENSHOTS_DIR / "02_markdown_script_output.png"))
             print(f"   Screenshot: {SCREENSHOTS_DIR}/02_markdown_script_output.png")
 
-            # Final screenshot
-            await page.screenshot(path=str(SCREENSHOTS_DIR / "03_all_outputs.png"))
-            print(f"   Screenshot: {SCREENSHOTS_DIR}/03_all_outputs.png")
-
-            await browser.close()
+            # Stop the server while Chromium shuts down
+            await asyncio.gather(
+                asyncio.to_thread(stop_server, server_process),
+                browser.close(),
+            )
 
         print("\n" + "=" * 50)
         print("PROGRAMMATIC SURFACING TEST COMPLETE")
@@ -232,12 +238,8 @@ print(html)
         return True
 
     finally:
-        print("\nStopping server...")
-        server_process.terminate()
-        try:
-            server_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            server_process.kill()
+        if server_process.poll() is None:
+            stop_server(server_process)
 
 
 if __name__ == "__main__":
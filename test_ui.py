@@ -12,14 +12,15 @@ Requirements:
 Usage:
     python test_ui.py
     python test_ui.py --headed  # Run with visible browser
+    python test_ui.py --server-url http://localhost:8079  # Reuse a running server
 """
 
 import argparse
 import asyncio
-import subprocess
 import sys
 import time
 from pathlib import Path
+from typing import Optional
 
 try:
     from playwright.async_api import async_playwright
@@ -31,138 +32,210 @@ except ImportError:
 
 
 SCREENSHOTS_DIR = Path(__file__).parent / "screenshots"
-SERVER_URL = "http://localhost:8080"
+# Cookies/localStorage from this run's baseline page, reused to warm-start contexts
+STORAGE_STATE_PATH = SCREENSHOTS_DIR / ".state.json"
+SERVER_HOST = "localhost"
+SERVER_PORT = 8080
+SERVER_URL = f"http://{SERVER_HOST}:{SERVER_PORT}"
 SERVER_STARTUP_TIMEOUT = 10
+DESKTOP_VIEWPORT = {"width": 1280, "height": 800}
+MOBILE_VIEWPORT = {"width": 375, "height": 667}
+
+# Subsystems that only slow down cold start when screenshotting localhost
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--no-first-run",
+    "--disable-features=Translate,BackForwardCache",
+]
+
+# Maps each selector to whether it matches a rendered element
+VISIBILITY_PROBE_JS = """
+    (selectors) => Object.fromEntries(selectors.map(sel => {
+        const el = document.querySelector(sel);
+        return [sel, !!el && el.getClientRects().length > 0];
+    }))
+"""
 
 
-async def wait_for_server(page, timeout: int = SERVER_STARTUP_TIMEOUT) -> bool:
-    """Wait for the server to be ready."""
+async def wait_for_server(timeout: int = SERVER_STARTUP_TIMEOUT) -> bool:
+    """Wait for the server to accept TCP connections."""
     start = time.time()
     while time.time() - start < timeout:
         try:
-            response = await page.goto(SERVER_URL, timeout=5000)
-            if response and response.ok:
-                return True
-        except Exception:
-            pass
-        await asyncio.sleep(0.5)
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(SERVER_HOST, SERVER_PORT), 0.2
+            )
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except (OSError, asyncio.TimeoutError):
+            await asyncio.sleep(0.05)
     return False
 
 
 async def take_screenshot(page, name: str):
     """Take a screenshot and save it to the screenshots directory."""
     filepath = SCREENSHOTS_DIR / f"{name}.png"
-    await page.screenshot(path=str(filepath), full_page=False)
+    # Finished animations and a hidden caret keep captures deterministic;
+    # CSS scale avoids encoding device-pixel-sized images
+    await page.screenshot(
+        path=str(filepath),
+        full_page=False,
+        animations="disabled",
+        caret="hide",
+        scale="css",
+    )
     print(f"  Saved: {filepath}")
 
 
-async def run_tests(headed: bool = False):
-    """Run UI tests and capture screenshots."""
-    SCREENSHOTS_DIR.mkdir(exist_ok=True)
-
-    # Start the server with uvicorn
-    print("Starting server...")
-    server_process = subprocess.Popen(
-        [sys.executable, "-m", "uvicorn", "app:app", "--host", "0.0.0.0", "--port", "8080"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        cwd=Path(__file__).parent
+async def open_page(browser, server_url: str, viewport: dict = DESKTOP_VIEWPORT):
+    """Open the app at server_url in a page with its own browser context."""
+    context = await browser.new_context(
+        viewport=viewport,
+        storage_state=str(STORAGE_STATE_PATH) if STORAGE_STATE_PATH.exists() else None,
     )
+    page = await context.new_page()
+    await page.goto(server_url)
+    await page.wait_for_load_state("networkidle")
+    return page
+
+
+async def capture_settings_panel(browser, server_url: str):
+    """Capture the settings panel opened."""
+    print("2. Capturing settings panel...")
+    page = await open_page(browser, server_url)
+    await page.click("#settings-btn")
+    await page.wait_for_selector("#settings-panel.open", state="visible", timeout=1000)
+    await take_screenshot(page, "02_settings_panel")
+    await page.context.close()
+
+
+async def capture_message_input(browser, server_url: str):
+    """Capture the input with a message typed in."""
+    print("3. Capturing message input...")
+    page = await open_page(browser, server_url)
+    await page.fill("#message-input", "Hello! This is a test message for the Claude Chat UI.")
+    await take_screenshot(page, "03_message_input")
+    await page.context.close()
+
+
+async def capture_file_browser(browser, server_url: str):
+    """Capture the file browser opened."""
+    print("4. Capturing file browser...")
+    page = await open_page(browser, server_url)
+    await page.click("#file-browser-btn")
+    await page.wait_for_selector("#file-browser-modal.visible", state="visible", timeout=1000)
+    await take_screenshot(page, "04_file_browser")
+    await page.context.close()
+
+
+async def capture_prompt_library(browser, server_url: str):
+    """Capture the prompt library opened."""
+    print("5. Capturing prompt library...")
+    page = await open_page(browser, server_url)
+    await page.click("#prompt-library-btn")
+    await page.wait_for_selector("#prompt-library-modal.visible", state="visible", timeout=1000)
+    await take_screenshot(page, "05_prompt_library")
+    await page.context.close()
+
+
+async def capture_dark_mode(browser, server_url: str):
+    """Capture the UI in dark mode."""
+    print("6. Capturing dark mode...")
+    page = await open_page(browser, server_url)
+    await page.click("#theme-toggle")
+    await page.wait_for_selector("html[data-theme='dark']", state="attached", timeout=1000)
+    await take_screenshot(page, "06_dark_mode")
+    await page.context.close()
+
+
+async def capture_mobile_view(browser, server_url: str):
+    """Capture the UI at a mobile viewport size."""
+    print("8. Capturing mobile view...")
+    page = await open_page(browser, server_url, viewport=MOBILE_VIEWPORT)
+    await take_screenshot(page, "08_mobile_view")
+    await page.context.close()
+
+
+# Trigger element for each independent capture step
+CAPTURE_STEPS = {
+    "#settings-btn": capture_settings_panel,
+    "#message-input": capture_message_input,
+    "#file-browser-btn": capture_file_browser,
+    "#prompt-library-btn": capture_prompt_library,
+    "#theme-toggle": capture_dark_mode,
+}
+
+
+async def run_tests(headed: bool = False, server_url: Optional[str] = None):
+    """Run UI tests and capture screenshots.
+
+    If server_url is given, that already-running server is used instead of
+    starting (and stopping) one.
+    """
+    SCREENSHOTS_DIR.mkdir(exist_ok=True)
+    # Start from a clean profile; state saved by an earlier run (theme,
+    # settings) would leak into this run's screenshots
+    STORAGE_STATE_PATH.unlink(missing_ok=True)
+
+    server_process = None
+    if server_url:
+        server_url = server_url.rstrip("/")
+        print(f"Using running server at {server_url}")
+    else:
+        # Start the server with uvicorn; it boots while the browser launches
+        server_url = SERVER_URL
+        print("Starting server...")
+        server_process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "uvicorn", "app:app", "--host", "0.0.0.0", "--port", str(SERVER_PORT),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=str(Path(__file__).parent)
+        )
 
     try:
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=not headed)
-            context = await browser.new_context(
-                viewport={"width": 1280, "height": 800}
-            )
-            page = await context.new_page()
+            browser = await p.chromium.launch(headless=not headed, args=CHROMIUM_ARGS)
 
             # Wait for server to start
-            print("Waiting for server to be ready...")
-            if not await wait_for_server(page):
-                print("ERROR: Server failed to start")
-                return False
+            if server_process:
+                print("Waiting for server to be ready...")
+                if not await wait_for_server():
+                    print("ERROR: Server failed to start")
+                    return False
 
             print("Server ready. Taking screenshots...\n")
 
-            # 1. Initial empty state
+            # 1. Initial empty state (the baseline, captured on its own)
             print("1. Capturing initial state...")
-            await page.goto(SERVER_URL)
-            await page.wait_for_load_state("networkidle")
-            await asyncio.sleep(0.5)
+            page = await open_page(browser, server_url)
+            await page.wait_for_selector("#message-input", state="visible", timeout=1000)
             await take_screenshot(page, "01_initial_state")
+            await page.context.storage_state(path=str(STORAGE_STATE_PATH))
 
-            # 2. Open settings panel
-            print("2. Capturing settings panel...")
-            settings_btn = page.locator("#settings-btn")
-            if await settings_btn.is_visible():
-                await settings_btn.click()
-                await asyncio.sleep(0.3)
-                await take_screenshot(page, "02_settings_panel")
-                # Close settings
-                close_btn = page.locator("#close-settings-btn")
-                if await close_btn.is_visible():
-                    await close_btn.click()
-
-            # 3. Type a message in the input
-            print("3. Capturing message input...")
-            message_input = page.locator("#message-input")
-            if await message_input.is_visible():
-                await message_input.fill("Hello! This is a test message for the Claude Chat UI.")
-                await asyncio.sleep(0.2)
-                await take_screenshot(page, "03_message_input")
-                await message_input.clear()
-
-            # 4. Open file browser (if available)
-            print("4. Capturing file browser...")
-            file_browser_btn = page.locator("#file-browser-btn")
-            if await file_browser_btn.is_visible():
-                await file_browser_btn.click()
-                await asyncio.sleep(0.3)
-                await take_screenshot(page, "04_file_browser")
-                # Close file browser
-                close_file_btn = page.locator("#close-file-browser")
-                if await close_file_btn.is_visible():
-                    await close_file_btn.click()
-
-            # 5. Open prompt library (if available)
-            print("5. Capturing prompt library...")
-            prompt_btn = page.locator("#prompt-library-btn")
-            if await prompt_btn.is_visible():
-                await prompt_btn.click()
-                await asyncio.sleep(0.3)
-                await take_screenshot(page, "05_prompt_library")
-                # Close prompt library
-                close_prompt_btn = page.locator("#close-prompt-library")
-                if await close_prompt_btn.is_visible():
-                    await close_prompt_btn.click()
-
-            # 6. Toggle dark mode
-            print("6. Capturing dark mode...")
-            theme_toggle = page.locator("#theme-toggle")
-            if await theme_toggle.is_visible():
-                await theme_toggle.click()
-                await asyncio.sleep(0.3)
-                await take_screenshot(page, "06_dark_mode")
-                # Toggle back to light mode
-                await theme_toggle.click()
-
-            # 7. Create new conversation
-            print("7. Capturing new conversation...")
-            new_chat_btn = page.locator("#new-chat-btn")
-            if await new_chat_btn.is_visible():
-                await new_chat_btn.click()
-                await asyncio.sleep(0.3)
-                await take_screenshot(page, "07_new_conversation")
+            # Probe every step's trigger element in one round trip; steps
+            # whose trigger isn't on the page are skipped
+            visible = await page.evaluate(VISIBILITY_PROBE_JS, [*CAPTURE_STEPS, "#new-chat-btn"])
 
-            # 8. Mobile viewport
-            print("8. Capturing mobile view...")
-            await page.set_viewport_size({"width": 375, "height": 667})
-            await asyncio.sleep(0.3)
-            await take_screenshot(page, "08_mobile_view")
+            # 2-6, 8. Independent UI states, each in its own context
+            await asyncio.gather(
+                *(capture(browser, server_url)
+                  for selector, capture in CAPTURE_STEPS.items() if visible[selector]),
+                capture_mobile_view(browser, server_url),
+            )
 
-            # Reset viewport
-            await page.set_viewport_size({"width": 1280, "height": 800})
+            # 7. Create new conversation. This changes server state, so it
+            # runs after the parallel captures
+            print("7. Capturing new conversation...")
+            if visible["#new-chat-btn"]:
+                await page.click("#new-chat-btn")
+                await page.wait_for_load_state("networkidle", timeout=2000)
+                await take_screenshot(page, "07_new_conversation")
 
             await browser.close()
 
@@ -171,13 +244,15 @@ async def run_tests(headed: bool = False):
         return True
 
     finally:
-        # Stop the server
-        print("\nStopping server...")
-        server_process.terminate()
-        try:
-            server_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            server_process.kill()
+        # Stop the server (only if we started it)
+        if server_process and server_process.returncode is None:
+            print("\nStopping server...")
+            server_process.terminate()
+            try:
+                await asyncio.wait_for(server_process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                server_process.kill()
+                await server_process.wait()
 
 
 def main():
@@ -187,9 +262,14 @@ def main():
         action="store_true",
         help="Run with visible browser window"
     )
+    parser.add_argument(
+        "--server-url",
+        default=None,
+        help="Use an already-running server (e.g. http://localhost:8079) instead of starting one"
+    )
     args = parser.parse_args()
 
-    success = asyncio.run(run_tests(headed=args.headed))
+    success = asyncio.run(run_tests(headed=args.headed, server_url=args.server_url))
     sys.exit(0 if success else 1)
 
 
@@ -0,0 +1,38 @@
+"""Helpers for consuming async event streams in tests."""
+
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+Event = Dict[str, Any]
+
+
+async def collect(
+    stream: AsyncIterator[Event],
+    stop_pred: Optional[Callable[[Event], bool]] = None
+) -> List[Event]:
+    """Collect events from a stream.
+
+    If stop_pred is given, stops after the first event it matches
+    (that event is included).
+    """
+    events = []
+    async with aclosing(stream):
+        async for event in stream:
+            events.append(event)
+            if stop_pred and stop_pred(event):
+                break
+    return events
+
+
+async def any_match(stream: AsyncIterator[Event], pred: Callable[[Event], bool]) -> bool:
+    """Check whether any event matches, stopping at the first match."""
+    async with aclosing(stream):
+        async for event in stream:
+            if pred(event):
+                return True
+    return False
+
+
+def of_type(event_type: str) -> Callable[[Event], bool]:
+    """Predicate matching events of the given type."""
+    return lambda event: event.get("type") == event_type
@@ -10,58 +10,72 @@ from services.agent_session_manager import (
 )
 
 
+@pytest.fixture(scope="module")
+def shared_manager():
+    """One session manager shared by the tests in this module."""
+    return AgentSessionManager()
+
+
+@pytest.fixture
+def manager(shared_manager):
+    """The shared session manager, reset after each test."""
+    yield shared_manager
+    shared_manager._reset()
+
+
 class TestAgentSessionManager:
     """Tests for AgentSessionManager class."""
 
-    def test_initial_state(self):
+    def test_initial_state(self, manager):
         """Test manager starts with no sessions."""
-        manager = AgentSessionManager()
         assert manager.get_active_session_count() == 0
 
-    def test_has_session_false_when_empty(self):
+    def test_has_session_false_when_empty(self, manager):
         """Test has_session returns False for non-existent session."""
-        manager = AgentSessionManager()
         assert not manager.has_session("conv-123")
 
-    def test_get_session_returns_none_when_empty(self):
+    def test_get_session_returns_none_when_empty(self, manager):
         """Test get_session returns None for non-existent session."""
-        manager = AgentSessionManager()
         assert manager.get_session("conv-123") is None
 
-    def test_get_lock_creates_lock(self):
+    def test_get_lock_creates_lock(self, manager):
         """Test get_lock creates and returns a lock."""
-        manager = AgentSessionManager()
         lock = manager.get_lock("conv-123")
         assert isinstance(lock, asyncio.Lock)
 
-    def test_get_lock_returns_same_lock(self):
+    def test_get_lock_outside_loop_is_usable_later(self, manager):
+        """Test a lock created without a running loop works inside one."""
+        lock = manager.get_lock("conv-123")
+
+        async def acquire():
+            async with lock:
+                return lock.locked()
+
+        assert asyncio.run(acquire()) is True
+
+    def test_get_lock_returns_same_lock(self, manager):
         """Test get_lock returns the same lock for same conversation."""
-        manager = AgentSessionManager()
         lock1 = manager.get_lock("conv-123")
         lock2 = manager.get_lock("conv-123")
         assert lock1 is lock2
 
-    def test_get_lock_different_locks_per_conversation(self):
+    def test_get_lock_different_locks_per_conversation(self, manager):
         """Test get_lock returns different locks for different conversations."""
-        manager = AgentSessionManager()
         lock1 = manager.get_lock("conv-123")
         lock2 = manager.get_lock("conv-456")
         assert lock1 is not lock2
 
-    def test_remove_session_nonexistent(self):
+    def test_remove_session_nonexistent(self, manager):
         """Test remove_session handles non-existent session gracefully."""
-        manager = AgentSessionManager()
         # Should not raise
         manager.remove_session("conv-123")
 
-    def test_get_session_info_none_when_empty(self):
+    def test_get_session_info_none_when_empty(self, manager):
         """Test get_session_info returns None for non-existent session."""
-        manager = AgentSessionManager()
         assert manager.get_session_info("conv-123") is None
 
-    def test_cleanup_stale_sessions_empty(self):
+    def test_cleanup_stale_sessions_empty(self, manager):
         """Test cleanup_stale_sessions returns 0 when no sessions."""
-        manager = AgentSessionManager()
         count = manager.cleanup_stale_sessions()
         assert count == 0
 
@@ -57,6 +57,15 @@ class TestNormalizeContent:
         assert isinstance(result, list)
         assert len(result) == 2
 
+    def test_normalize_list_drops_none_blocks(self):
+        """None entries in a block list should be dropped."""
+        content = [None, {"type": "text", "text": "Hello"}, None, "world"]
+        result = normalize_content(content)
+        assert result == [
+            {"type": "text", "text": "Hello"},
+            {"type": "text", "text": "world"}
+        ]
+
     def test_normalize_mixed_content_blocks(self):
         """Mixed content blocks (text + tool_use) should be normalized."""
         content = [
@@ -115,6 +124,16 @@ class TestNormalizeBlock:
         result = normalize_block({"type": "text", "text": "Hello"})
         assert result == {"type": "text", "text": "Hello"}
 
+    def test_canonical_text_block_returned_as_is(self):
+        """Already-canonical text blocks should not be copied."""
+        block = {"type": "text", "text": "Hello"}
+        assert normalize_block(block) is block
+
+    def test_text_block_extra_keys_dropped(self):
+        """Text blocks with extra keys should be reduced to type and text."""
+        block = {"type": "text", "text": "Hello", "citations": []}
+        assert normalize_block(block) == {"type": "text", "text": "Hello"}
+
     def test_normalize_tool_use_block(self):
         """Tool use block should include all required fields."""
         result = normalize_block({
@@ -152,6 +171,12 @@ class TestExtractTextContent:
         result = extract_text_content(content)
         assert result == "Hello\nworld!"
 
+    def test_extract_from_list_with_strings(self):
+        """Bare strings in a block list are kept in order."""
+        content = ["Hello", {"type": "image", "source": {}}, {"type": "text", "text": "world!"}]
+        result = extract_text_content(content)
+        assert result == "Hello\nworld!"
+
     def test_extract_from_none(self):
         """Extract from None returns empty string."""
         result = extract_text_content(None)
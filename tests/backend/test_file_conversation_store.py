@@ -0,0 +1,30 @@
+"""Tests for the file-based conversation store."""
+
+import pytest
+
+
+class TestClearAll:
+    """Tests for FileConversationStore.clear_all."""
+
+    @pytest.mark.asyncio
+    async def test_clear_all_removes_conversations(self, file_store):
+        """clear_all should delete every conversation folder."""
+        await file_store.create_conversation(title="One")
+        await file_store.create_conversation(title="Two")
+
+        removed = await file_store.clear_all()
+
+        assert removed == 2
+        assert await file_store.list_conversations() == []
+        assert file_store.base_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_fixture_teardown_empties_shared_store(self, session_file_store):
+        """The file_store teardown leaves the shared store empty but usable."""
+        await session_file_store.create_conversation(title="Leftover")
+
+        # What file_store runs after each test
+        await session_file_store.clear_all()
+
+        assert await session_file_store.list_conversations() == []
+        assert session_file_store.base_path.exists()
@@ -10,39 +10,27 @@ from services.mock_streams import (
     mock_error_stream,
 )
 
+from ._stream_utils import any_match, collect, of_type
+
 
 class TestMockMode:
     """Test suite for mock mode detection."""
 
-    def test_mock_mode_disabled_by_default(self, monkeypatch):
-        """Mock mode should be disabled by default."""
-        monkeypatch.delenv("MOCK_LLM", raising=False)
-        assert is_mock_mode() is False
-
-    def test_mock_mode_enabled_with_1(self, monkeypatch):
-        """Mock mode should be enabled with MOCK_LLM=1."""
-        monkeypatch.setenv("MOCK_LLM", "1")
-        assert is_mock_mode() is True
-
-    def test_mock_mode_enabled_with_true(self, monkeypatch):
-        """Mock mode should be enabled with MOCK_LLM=true."""
-        monkeypatch.setenv("MOCK_LLM", "true")
-        assert is_mock_mode() is True
-
-    def test_mock_mode_enabled_with_yes(self, monkeypatch):
-        """Mock mode should be enabled with MOCK_LLM=yes."""
-        monkeypatch.setenv("MOCK_LLM", "yes")
-        assert is_mock_mode() is True
-
-    def test_mock_mode_case_insensitive(self, monkeypatch):
-        """Mock mode should be case insensitive."""
-        monkeypatch.setenv("MOCK_LLM", "TRUE")
-        assert is_mock_mode() is True
-
-    def test_mock_mode_disabled_with_0(self, monkeypatch):
-        """Mock mode should be disabled with MOCK_LLM=0."""
-        monkeypatch.setenv("MOCK_LLM", "0")
-        assert is_mock_mode() is False
+    @pytest.mark.parametrize("value,expected", [
+        (None, False),   # disabled by default
+        ("1", True),
+        ("true", True),
+        ("yes", True),
+        ("TRUE", True),  # case insensitive
+        ("0", False),
+    ])
+    def test_mock_mode_from_env(self, monkeypatch, value, expected):
+        """MOCK_LLM should enable mock mode only for truthy values."""
+        if value is None:
+            monkeypatch.delenv("MOCK_LLM", raising=False)
+        else:
+            monkeypatch.setenv("MOCK_LLM", value)
+        assert is_mock_mode() is expected
 
 
 class TestMockNormalChatStream:
@@ -51,64 +39,51 @@ class TestMockNormalChatStream:
     @pytest.mark.asyncio
     async def test_emits_done_event(self):
         """Stream should end with a done event."""
-        events = []
-        async for event in mock_normal_chat_stream("test-id", delay_ms=1):
-            events.append(event)
+        events = await collect(mock_normal_chat_stream("test-id", delay_ms=1))
 
         assert events[-1]["type"] == "done"
 
     @pytest.mark.asyncio
     async def test_emits_text_events(self):
         """Stream should emit text events."""
-        events = []
-        async for event in mock_normal_chat_stream("test-id", delay_ms=1):
-            events.append(event)
-
-        text_events = [e for e in events if e.get("type") == "text"]
-        assert len(text_events) > 0
+        assert await any_match(mock_normal_chat_stream("test-id", delay_ms=1), of_type("text"))
 
     @pytest.mark.asyncio
     async def test_emits_thinking_when_enabled(self):
         """Stream should emit thinking events when enabled."""
-        events = []
-        async for event in mock_normal_chat_stream("test-id", thinking_enabled=True, delay_ms=1):
-            events.append(event)
-
-        thinking_events = [e for e in events if e.get("type") == "thinking"]
-        assert len(thinking_events) > 0
+        stream = mock_normal_chat_stream("test-id", thinking_enabled=True, delay_ms=1)
+        assert await any_match(stream, of_type("thinking"))
 
     @pytest.mark.asyncio
     async def test_no_thinking_when_disabled(self):
         """Stream should not emit thinking events when disabled."""
-        events = []
-        async for event in mock_normal_chat_stream("test-id", thinking_enabled=False, delay_ms=1):
-            events.append(event)
-
-        thinking_events = [e for e in events if e.get("type") == "thinking"]
-        assert len(thinking_events) == 0
+        stream = mock_normal_chat_stream("test-id", thinking_enabled=False, delay_ms=1)
+        assert not await any_match(stream, of_type("thinking"))
 
     @pytest.mark.asyncio
     async def test_emits_web_search_when_enabled(self):
         """Stream should emit web search events when enabled."""
-        events = []
-        async for event in mock_normal_chat_stream("test-id", web_search_enabled=True, delay_ms=1):
-            events.append(event)
+        events = await collect(
+            mock_normal_chat_stream("test-id", web_search_enabled=True, delay_ms=1),
+            stop_pred=of_type("web_search_result")
+        )
 
-        web_search_start = [e for e in events if e.get("type") == "web_search_start"]
-        web_search_result = [e for e in events if e.get("type") == "web_search_result"]
-
-        assert len(web_search_start) > 0
-        assert len(web_search_result) > 0
+        assert any(e.get("type") == "web_search_start" for e in events)
+        assert events[-1]["type"] == "web_search_result"
 
     @pytest.mark.asyncio
     async def test_no_web_search_when_disabled(self):
         """Stream should not emit web search events when disabled."""
-        events = []
-        async for event in mock_normal_chat_stream("test-id", web_search_enabled=False, delay_ms=1):
-            events.append(event)
+        stream = mock_normal_chat_stream("test-id", web_search_enabled=False, delay_ms=1)
+        assert not await any_match(stream, lambda e: "web_search" in e.get("type", ""))
+
+    @pytest.mark.asyncio
+    async def test_zero_delay_matches_paced_events(self):
+        """Stream with no delay should emit the same events as a paced one."""
+        fast = [e["type"] for e in await collect(mock_normal_chat_stream("test-id", delay_ms=0))]
+        paced = [e["type"] for e in await collect(mock_normal_chat_stream("test-id", delay_ms=2))]
 
-        web_search_events = [e for e in events if "web_search" in e.get("type", "")]
-        assert len(web_search_events) == 0
+        assert fast == paced
 
 
 class TestMockAgentChatStream:
@@ -117,9 +92,7 @@ class TestMockAgentChatStream:
     @pytest.mark.asyncio
     async def test_emits_session_id(self):
         """Stream should emit a session_id event."""
-        events = []
-        async for event in mock_agent_chat_stream("test-id", delay_ms=1):
-            events.append(event)
+        events = await collect(mock_agent_chat_stream("test-id", delay_ms=1))
 
         session_events = [e for e in events if e.get("type") == "session_id"]
         assert len(session_events) == 1
@@ -127,49 +100,31 @@ class TestMockAgentChatStream:
     @pytest.mark.asyncio
     async def test_emits_tool_use_when_enabled(self):
         """Stream should emit tool_use events when enabled."""
-        events = []
-        async for event in mock_agent_chat_stream("test-id", include_tool_use=True, delay_ms=1):
-            events.append(event)
-
-        tool_use_events = [e for e in events if e.get("type") == "tool_use"]
-        assert len(tool_use_events) > 0
+        stream = mock_agent_chat_stream("test-id", include_tool_use=True, delay_ms=1)
+        assert await any_match(stream, of_type("tool_use"))
 
     @pytest.mark.asyncio
     async def test_emits_tool_result_when_enabled(self):
         """Stream should emit tool_result events when enabled."""
-        events = []
-        async for event in mock_agent_chat_stream("test-id", include_tool_use=True, delay_ms=1):
-            events.append(event)
-
-        tool_result_events = [e for e in events if e.get("type") == "tool_result"]
-        assert len(tool_result_events) > 0
+        stream = mock_agent_chat_stream("test-id", include_tool_use=True, delay_ms=1)
+        assert await any_match(stream, of_type("tool_result"))
 
     @pytest.mark.asyncio
     async def test_emits_surface_content_when_enabled(self):
         """Stream should emit surface_content events when enabled."""
-        events = []
-        async for event in mock_agent_chat_stream("test-id", include_surface=True, delay_ms=1):
-            events.append(event)
-
-        surface_events = [e for e in events if e.get("type") == "surface_content"]
-        assert len(surface_events) > 0
+        stream = mock_agent_chat_stream("test-id", include_surface=True, delay_ms=1)
+        assert await any_match(stream, of_type("surface_content"))
 
     @pytest.mark.asyncio
     async def test_stops_when_event_set(self):
         """Stream should stop when stop_event is set."""
         stop_event = asyncio.Event()
-        events = []
-
-        async def stop_after_few():
-            await asyncio.sleep(0.1)
-            stop_event.set()
-
-        asyncio.create_task(stop_after_few())
+        asyncio.get_running_loop().call_later(0.1, stop_event.set)
 
-        async for event in mock_agent_chat_stream("test-id", stop_event=stop_event, delay_ms=50):
-            events.append(event)
-            if event.get("type") == "stopped":
-                break
+        events = await collect(
+            mock_agent_chat_stream("test-id", stop_event=stop_event, delay_ms=50),
+            stop_pred=of_type("stopped")
+        )
 
         stopped_events = [e for e in events if e.get("type") == "stopped"]
         assert len(stopped_events) == 1
@@ -181,9 +136,7 @@ class TestMockErrorStream:
     @pytest.mark.asyncio
     async def test_emits_error_event(self):
         """Stream should emit an error event."""
-        events = []
-        async for event in mock_error_stream(delay_before_error_ms=1):
-            events.append(event)
+        events = await collect(mock_error_stream(delay_before_error_ms=1))
 
         error_events = [e for e in events if e.get("type") == "error"]
         assert len(error_events) == 1
@@ -191,9 +144,7 @@ class TestMockErrorStream:
     @pytest.mark.asyncio
     async def test_custom_error_message(self):
         """Stream should use custom error message."""
-        events = []
-        async for event in mock_error_stream(error_message="Custom error", delay_before_error_ms=1):
-            events.append(event)
+        events = await collect(mock_error_stream(error_message="Custom error", delay_before_error_ms=1))
 
         error_event = [e for e in events if e.get("type") == "error"][0]
         assert error_event["content"] == "Custom error"
@@ -6,38 +6,71 @@ through mocking the dependency functions.
 """
 
 import pytest
-from unittest.mock import patch, MagicMock
+from types import MappingProxyType
+from unittest.mock import patch
+
+
+_DEFAULTS = {
+    "normal_model": "claude-sonnet-4",
+    "normal_system_prompt": "Default system prompt",
+    "normal_thinking_enabled": False,
+    "normal_thinking_budget": 10000,
+    "normal_max_tokens": 4096,
+    "normal_temperature": 0.7,
+    "normal_top_p": None,
+    "normal_top_k": None,
+    "normal_prune_threshold": 50,
+    "normal_web_search_enabled": False,
+    "normal_web_search_max_uses": 5,
+    "agent_model": "claude-sonnet-4",
+    "agent_system_prompt": "Agent default prompt",
+    "agent_tools": {"Read": True, "Write": True},
+    "agent_cwd": "/home/user",
+    "agent_thinking_budget": 20000,
+}
+# Read-only view: resolve_settings merges into a new dict and must not mutate it
+_DEFAULTS_VIEW = MappingProxyType(_DEFAULTS)
+
+
+class _FakeApiSettings:
+    """Stand-in for the api.settings functions settings_service uses."""
+
+    __slots__ = ("project_settings", "default_loads", "files_version")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear project settings, the defaults load counter and file version."""
+        self.project_settings = {}
+        self.default_loads = 0
+        self.files_version = (None, None)
+
+    def load_default_settings(self):
+        self.default_loads += 1
+        return _DEFAULTS_VIEW
+
+    def get_project_settings(self, project_id=None):
+        return self.project_settings
+
+    def settings_files_version(self):
+        return self.files_version
+
+
+# Import once with the fake standing in for api.settings (avoids circular
+# imports); settings_service binds the fake's methods for good.
+_api_settings = _FakeApiSettings()
+with patch.dict("sys.modules", {"api.settings": _api_settings}):
+    import services.settings_service as settings_module
+    from services.settings_service import SettingsService
 
 
-# Use module-level mocking to avoid circular imports
 @pytest.fixture(autouse=True)
 def mock_api_settings():
-    """Mock api.settings before importing settings_service."""
-    mock_defaults = {
-        "normal_model": "claude-sonnet-4",
-        "normal_system_prompt": "Default system prompt",
-        "normal_thinking_enabled": False,
-        "normal_thinking_budget": 10000,
-        "normal_max_tokens": 4096,
-        "normal_temperature": 0.7,
-        "normal_top_p": None,
-        "normal_top_k": None,
-        "normal_prune_threshold": 50,
-        "normal_web_search_enabled": False,
-        "normal_web_search_max_uses": 5,
-        "agent_model": "claude-sonnet-4",
-        "agent_system_prompt": "Agent default prompt",
-        "agent_tools": {"Read": True, "Write": True},
-        "agent_cwd": "/home/user",
-        "agent_thinking_budget": 20000,
-    }
-
-    mock_module = MagicMock()
-    mock_module.load_default_settings = MagicMock(return_value=mock_defaults)
-    mock_module.get_project_settings = MagicMock(return_value={})
-
-    with patch.dict("sys.modules", {"api.settings": mock_module}):
-        yield mock_module
+    """The api.settings fake, reset per test."""
+    _api_settings.reset()
+    settings_module.clear_settings_cache()
+    return _api_settings
 
 
 class TestSettingsService:
@@ -45,8 +78,6 @@ class TestSettingsService:
 
     def test_resolve_with_defaults_only(self, mock_api_settings):
         """Should return defaults when no overrides provided."""
-        from services.settings_service import SettingsService
-
         service = SettingsService()
         result = service.resolve_settings()
 
@@ -55,13 +86,11 @@ class TestSettingsService:
 
     def test_resolve_with_project_override(self, mock_api_settings):
         """Project settings should override defaults."""
-        mock_api_settings.get_project_settings.return_value = {
+        mock_api_settings.project_settings = {
             "normal_model": "claude-opus-4",
             "normal_thinking_budget": 50000,
         }
 
-        from services.settings_service import SettingsService
-
         service = SettingsService()
         result = service.resolve_settings(project_id="proj-1")
 
@@ -72,8 +101,6 @@ class TestSettingsService:
 
     def test_resolve_with_conversation_override(self, mock_api_settings):
         """Conversation settings should override all."""
-        from services.settings_service import SettingsService
-
         service = SettingsService()
         conversation_settings = {
             "normal_model": "claude-haiku",
@@ -87,13 +114,11 @@ class TestSettingsService:
 
     def test_resolve_priority_cascade(self, mock_api_settings):
         """Conversation > Project > Defaults."""
-        mock_api_settings.get_project_settings.return_value = {
+        mock_api_settings.project_settings = {
             "normal_model": "claude-opus-4",
             "normal_thinking_budget": 50000,
         }
 
-        from services.settings_service import SettingsService
-
         service = SettingsService()
         conversation_settings = {
             "normal_model": "claude-haiku",  # Should win
@@ -110,8 +135,6 @@ class TestSettingsService:
 
     def test_none_values_not_applied(self, mock_api_settings):
         """None values should not override existing settings."""
-        from services.settings_service import SettingsService
-
         service = SettingsService()
         conversation_settings = {
             "normal_model": None,  # Should not override
@@ -123,14 +146,57 @@ class TestSettingsService:
         assert result["normal_model"] == "claude-sonnet-4"  # Default preserved
         assert result["normal_temperature"] == 0.5  # Conversation applied
 
+    def test_repeat_resolution_is_cached(self, mock_api_settings):
+        """Identical resolutions reuse the cache until it is cleared."""
+        service = SettingsService()
+        conversation_settings = {"normal_temperature": 0.5}
+
+        first = service.resolve_settings("proj-1", conversation_settings)
+        first["normal_model"] = "mutated"
+        second = service.resolve_settings("proj-1", conversation_settings)
+
+        assert second["normal_model"] == "claude-sonnet-4"
+        assert mock_api_settings.default_loads == 1
+
+        settings_module.clear_settings_cache()
+        service.resolve_settings("proj-1", conversation_settings)
+        assert mock_api_settings.default_loads == 2
+
+    def test_settings_file_change_invalidates_cache(self, mock_api_settings):
+        """A changed settings file stamp forces a fresh resolution."""
+        service = SettingsService()
+
+        service.resolve_settings("proj-1")
+        mock_api_settings.files_version = ((1, 10), None)
+        service.resolve_settings("proj-1")
+
+        assert mock_api_settings.default_loads == 2
+
+    def test_nested_values_are_not_shared(self, mock_api_settings):
+        """Mutating a nested value in one result leaves the cache intact."""
+        service = SettingsService()
+
+        first = service.resolve_settings()
+        first["agent_tools"]["Read"] = False
+        second = service.resolve_settings()
+
+        assert second["agent_tools"] == {"Read": True, "Write": True}
+
+    def test_unhashable_values_resolve_uncached(self, mock_api_settings):
+        """Dict-valued conversation settings still resolve."""
+        service = SettingsService()
+        conversation_settings = {"agent_tools": {"Read": False}}
+
+        result = service.resolve_settings(conversation_settings=conversation_settings)
+
+        assert result["agent_tools"] == {"Read": False}
+
 
 class TestResolveAgentSettings:
     """Test suite for resolve_agent_settings method."""
 
     def test_returns_agent_keys(self, mock_api_settings):
         """Should return only agent-relevant keys."""
-        from services.settings_service import SettingsService
-
         service = SettingsService()
         result = service.resolve_agent_settings()
 
@@ -144,8 +210,6 @@ class TestResolveAgentSettings:
 
     def test_maps_keys_correctly(self, mock_api_settings):
         """Should map agent_* keys to unprefixed keys."""
-        from services.settings_service import SettingsService
-
         service = SettingsService()
         result = service.resolve_agent_settings()
 
@@ -158,8 +222,6 @@ class TestResolveNormalSettings:
 
     def test_returns_normal_keys(self, mock_api_settings):
         """Should return only normal-relevant keys."""
-        from services.settings_service import SettingsService
-
         service = SettingsService()
         result = service.resolve_normal_settings()
 
@@ -173,8 +235,6 @@ class TestResolveNormalSettings:
 
     def test_maps_keys_correctly(self, mock_api_settings):
         """Should map normal_* keys to unprefixed keys."""
-        from services.settings_service import SettingsService
-
         service = SettingsService()
         result = service.resolve_normal_settings()
 
@@ -188,12 +248,10 @@ class TestSingleton:
 
     def test_get_settings_service_returns_same_instance(self, mock_api_settings):
         """Should return the same instance."""
-        import services.settings_service as mod
-
         # Reset the singleton
-        mod._settings_service = None
+        settings_module._settings_service = None
 
-        service1 = mod.get_settings_service()
-        service2 = mod.get_settings_service()
+        service1 = settings_module.get_settings_service()
+        service2 = settings_module.get_settings_service()
 
         assert service1 is service2
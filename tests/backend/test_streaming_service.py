@@ -62,6 +62,18 @@ class TestStreamingService:
         # Stop event should now be set
         assert stop_event.is_set()
 
+    def test_ended_agent_stream_event_is_not_shared(self, streaming_service: StreamingService):
+        """Ending a stream leaves its event alone; later streams get their own."""
+        stop_event = streaming_service.start_stream("conv-4", StreamType.AGENT)
+        streaming_service.stop_stream("conv-4")
+        streaming_service.end_stream("conv-4")
+
+        other = streaming_service.start_stream("conv-6", StreamType.AGENT)
+
+        assert other is not stop_event
+        assert stop_event.is_set()
+        assert not other.is_set()
+
     def test_stop_normal_stream_fails(self, streaming_service: StreamingService):
         """Stopping a normal stream should fail gracefully."""
         streaming_service.start_stream("conv-5", StreamType.NORMAL)
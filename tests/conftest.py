@@ -5,6 +5,7 @@ import os
 import sys
 import tempfile
 import pytest
+import pytest_asyncio
 from typing import Generator, AsyncGenerator
 
 # Add project root to Python path
@@ -13,12 +14,13 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop when installed, matching uvicorn[standard]."""
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
 
 
 @pytest.fixture
@@ -36,16 +38,23 @@ def mock_env(monkeypatch):
     return monkeypatch
 
 
-@pytest.fixture
-async def file_store(temp_data_dir):
-    """Create a file conversation store with temporary directory."""
+@pytest_asyncio.fixture(scope="session")
+async def session_file_store(tmp_path_factory):
+    """One file conversation store, initialized once per session."""
     from services.file_conversation_store import FileConversationStore
 
-    store = FileConversationStore(data_dir=temp_data_dir)
+    store = FileConversationStore(base_path=str(tmp_path_factory.mktemp("conversations")))
     await store.initialize()
     return store
 
 
+@pytest_asyncio.fixture
+async def file_store(session_file_store):
+    """The session file conversation store, emptied after each test."""
+    yield session_file_store
+    await session_file_store.clear_all()
+
+
 @pytest.fixture
 def streaming_service():
     """Create a streaming service instance."""
@@ -54,9 +63,9 @@ def streaming_service():
     return StreamingService()
 
 
-@pytest.fixture
-def settings_service(temp_data_dir):
-    """Create a settings service with temporary directory."""
+@pytest.fixture(scope="session")
+def settings_service():
+    """Create a settings service; it holds no state between calls."""
     from services.settings_service import SettingsService
 
-    return SettingsService(data_dir=temp_data_dir)
+    return SettingsService()
@@ -0,0 +1,20 @@
+"""Shared .env loading for the standalone tool scripts."""
+
+import os
+from pathlib import Path
+
+
+def load_env(path: Path) -> None:
+    """Load KEY=VALUE lines from a .env file into os.environ.
+
+    Existing environment variables are never overridden.
+    """
+    if not path.exists():
+        return
+
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, _, value = line.partition("=")
+                os.environ.setdefault(key.strip(), value.strip())
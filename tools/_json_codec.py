@@ -0,0 +1,27 @@
+"""JSON encoding shared by the MCP tool servers.
+
+orjson is optional; it parses bytes directly and serializes straight to
+bytes. The stdlib fallback serializes just as compactly, so responses
+spliced from pre-serialized pieces match ones serialized whole.
+"""
+
+import json
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+
+    def json_dumps_line(obj) -> bytes:
+        """Serialize obj as one newline-terminated frame."""
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def json_dumps_line(obj) -> bytes:
+        """Serialize obj as one newline-terminated frame."""
+        return (json.dumps(obj, separators=(",", ":")) + "\n").encode()
@@ -0,0 +1,129 @@
+"""Pre-warmed Python process that forks to run surface_from_script jobs.
+
+Started by surface_mcp_server with one end of a SOCK_SEQPACKET socketpair
+(its fd number is argv[1]). Each job message is JSON with the script path,
+args and cwd, and carries the stdout and stderr pipe fds. The zygote forks
+a child that runs the script with runpy, replies with the child's pid, then
+with its return code once it exits. Forking per job keeps scripts isolated
+from each other while skipping interpreter startup and common imports.
+"""
+
+import atexit
+import json
+import os
+import runpy
+import socket
+import sys
+import threading
+import traceback
+
+# Imported once up front so forked scripts get them for free
+PRELOAD_MODULES = (
+    "collections", "csv", "datetime", "html", "json", "math", "random",
+    "re", "statistics", "numpy", "pandas",
+)
+
+
+def preload() -> None:
+    """Import PRELOAD_MODULES, skipping any that aren't installed."""
+    for name in PRELOAD_MODULES:
+        try:
+            __import__(name)
+        except Exception:
+            pass
+
+
+def reseed() -> None:
+    """Give the forked child its own random state.
+
+    The random module reseeds itself after fork, but numpy's global
+    RandomState doesn't, so each child would otherwise start from the
+    state preloaded in the zygote.
+    """
+    numpy = sys.modules.get("numpy")
+    if numpy is not None:
+        numpy.random.seed()
+
+
+def finalize() -> None:
+    """Do the interpreter-exit work os._exit skips.
+
+    Joins non-daemon threads and runs atexit handlers, in the order a
+    normal interpreter exit does.
+    """
+    threading._shutdown()
+    atexit._run_exitfuncs()
+
+
+def run_child(job: dict, out_fd: int, err_fd: int) -> None:
+    """Run the job's script as __main__ in this forked child; never returns."""
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(out_fd, 1)
+    os.dup2(err_fd, 2)
+    for fd in (devnull, out_fd, err_fd):
+        os.close(fd)
+
+    code = 0
+    reseed()
+    try:
+        os.chdir(job["cwd"])
+        sys.argv = [job["script"], *job["args"]]
+        sys.path[0] = os.path.dirname(job["script"])
+        runpy.run_path(job["script"], run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        # Report from the script's own frames, as a plain `python script.py` would
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != job["script"]:
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb)
+        code = 1
+
+    finalize()
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except Exception:
+        code = code or 1
+    os._exit(code & 0xFF)
+
+
+def main() -> None:
+    """Serve jobs until the server closes its end of the socket."""
+    sock = socket.socket(fileno=int(sys.argv[1]))
+    preload()
+
+    while True:
+        try:
+            msg, fds, _flags, _addr = socket.recv_fds(sock, 1 << 20, 2)
+        except OSError:
+            break
+        if not msg:
+            break
+
+        job = json.loads(msg)
+        pid = os.fork()
+        if pid == 0:
+            sock.close()
+            run_child(job, fds[0], fds[1])
+        for fd in fds:
+            os.close(fd)
+
+        try:
+            sock.send(json.dumps({"pid": pid}).encode())
+            _, status = os.waitpid(pid, 0)
+            sock.send(json.dumps({"returncode": os.waitstatus_to_exitcode(status)}).encode())
+        except OSError:
+            break
+
+
+if __name__ == "__main__":
+    main()
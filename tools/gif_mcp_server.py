@@ -10,24 +10,38 @@ Usage:
 The server reads JSON-RPC messages from stdin and writes responses to stdout.
 """
 
+import http.client
 import json
 import sys
 import os
-import urllib.request
 import urllib.parse
 from pathlib import Path
+from typing import Optional
+
+try:
+    from _env import load_env
+    from _json_codec import json_dumps, json_loads
+except ImportError:
+    from tools._env import load_env
+    from tools._json_codec import json_dumps, json_loads
 
 # Load .env from project root
-env_path = Path(__file__).parent.parent / ".env"
-if env_path.exists():
-    with open(env_path) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                key, value = line.split("=", 1)
-                os.environ.setdefault(key.strip(), value.strip())
+load_env(Path(__file__).parent.parent / ".env")
 
 GIPHY_API_KEY = os.environ.get("GIPHY_API_KEY")
+GIPHY_HOST = "api.giphy.com"
+GIPHY_SEARCH_PATH = "/v1/gifs/search"
+# Only the query varies per search; the rest of the URL is encoded once
+GIPHY_SEARCH_PREFIX = GIPHY_SEARCH_PATH + "?" + urllib.parse.urlencode({
+    "api_key": GIPHY_API_KEY or "",
+    "limit": 1,
+    "rating": "g"
+}) + "&q="
+
+# Kept alive across tool calls so repeat searches skip the TLS handshake
+_giphy_conn: Optional[http.client.HTTPSConnection] = None
+# How a reused keep-alive connection fails once the server has closed it
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
 
 # Tool definition
 SEARCH_GIF_TOOL = {
@@ -45,24 +59,66 @@ SEARCH_GIF_TOOL = {
     }
 }
 
+# Static results, shared by every response instead of rebuilt per request
+INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {}
+    },
+    "serverInfo": {
+        "name": "gif-search",
+        "version": "1.0.0"
+    }
+}
+
+TOOLS_LIST_RESULT = {
+    "tools": [SEARCH_GIF_TOOL]
+}
+
+# Pre-serialized responses for the static methods: PREFIX + json(id) + suffix
+RESPONSE_PREFIX = b'{"jsonrpc":"2.0","id":'
+STATIC_RESPONSE_SUFFIXES = {
+    "initialize": b',"result":' + json_dumps(INITIALIZE_RESULT) + b'}\n',
+    "tools/list": b',"result":' + json_dumps(TOOLS_LIST_RESULT) + b'}\n',
+}
+
+
+def giphy_get(path: str) -> bytes:
+    """GET a path from the Giphy API over the shared keep-alive connection."""
+    global _giphy_conn
+    while True:
+        reused = _giphy_conn is not None
+        if not reused:
+            _giphy_conn = http.client.HTTPSConnection(GIPHY_HOST, timeout=10)
+        try:
+            _giphy_conn.request("GET", path)
+            response = _giphy_conn.getresponse()
+            body = response.read()
+        except STALE_CONNECTION_ERRORS:
+            # The server may have dropped an idle connection; reconnect once
+            _giphy_conn.close()
+            _giphy_conn = None
+            if not reused:
+                raise
+            continue
+        except (http.client.HTTPException, OSError):
+            # Timeouts and other failures aren't retried
+            _giphy_conn.close()
+            _giphy_conn = None
+            raise
+
+        if response.status != 200:
+            raise RuntimeError(f"HTTP Error {response.status}: {response.reason}")
+        return body
+
 
 def search_giphy(query: str) -> dict:
     """Search Giphy API for a GIF."""
     if not GIPHY_API_KEY:
         return {"error": "GIPHY_API_KEY not configured"}
 
-    base_url = "https://api.giphy.com/v1/gifs/search"
-    params = urllib.parse.urlencode({
-        "api_key": GIPHY_API_KEY,
-        "q": query,
-        "limit": 1,
-        "rating": "g"
-    })
-    url = f"{base_url}?{params}"
-
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            data = json.loads(response.read().decode())
+        data = json_loads(giphy_get(GIPHY_SEARCH_PREFIX + urllib.parse.quote_plus(query)))
 
         if not data.get("data"):
             return {"error": f"No GIFs found for '{query}'"}
@@ -77,120 +133,138 @@ def search_giphy(query: str) -> dict:
         return {"error": str(e)}
 
 
-def handle_request(request: dict) -> dict:
-    """Handle an MCP JSON-RPC request."""
-    method = request.get("method", "")
-    request_id = request.get("id")
-    params = request.get("params", {})
+def handle_initialize(request_id, params: dict) -> dict:
+    """Handle the MCP initialize handshake."""
+    return {"jsonrpc": "2.0", "id": request_id, "result": INITIALIZE_RESULT}
+
+
+def handle_initialized(request_id, params: dict) -> None:
+    """This is a notification, no response needed."""
+    return None
+
+
+def handle_tools_list(request_id, params: dict) -> dict:
+    """List the tools this server provides."""
+    return {"jsonrpc": "2.0", "id": request_id, "result": TOOLS_LIST_RESULT}
 
-    if method == "initialize":
+
+def handle_tools_call(request_id, params: dict) -> dict:
+    """Run a tool call."""
+    tool_name = params.get("name", "")
+    arguments = params.get("arguments", {})
+
+    if tool_name != "search_gif":
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {
+                "code": -32601,
+                "message": f"Unknown tool: {tool_name}"
+            }
+        }
+
+    query = arguments.get("query", "")
+    if not query:
         return {
             "jsonrpc": "2.0",
             "id": request_id,
             "result": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {}
-                },
-                "serverInfo": {
-                    "name": "gif-search",
-                    "version": "1.0.0"
-                }
+                "content": [{"type": "text", "text": "Error: No search query provided"}],
+                "isError": True
             }
         }
 
-    elif method == "notifications/initialized":
-        # This is a notification, no response needed
-        return None
+    result = search_giphy(query)
 
-    elif method == "tools/list":
+    if result.get("error"):
         return {
             "jsonrpc": "2.0",
             "id": request_id,
             "result": {
-                "tools": [SEARCH_GIF_TOOL]
+                "content": [{"type": "text", "text": f"Error: {result['error']}"}],
+                "isError": True
             }
         }
 
-    elif method == "tools/call":
-        tool_name = params.get("name", "")
-        arguments = params.get("arguments", {})
-
-        if tool_name == "search_gif":
-            query = arguments.get("query", "")
-            if not query:
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "content": [{"type": "text", "text": "Error: No search query provided"}],
-                        "isError": True
-                    }
-                }
+    # Return the GIF info - the URL will be auto-embedded by the frontend
+    response_text = f"""Found a GIF for "{query}":
 
-            result = search_giphy(query)
+**{result['title']}**
 
-            if result.get("error"):
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "content": [{"type": "text", "text": f"Error: {result['error']}"}],
-                        "isError": True
-                    }
-                }
+{result['url']}"""
 
-            # Return the GIF info - the URL will be auto-embedded by the frontend
-            response_text = f"""Found a GIF for "{query}":
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "result": {
+            "content": [{"type": "text", "text": response_text}]
+        }
+    }
 
-**{result['title']}**
 
-{result['url']}"""
+# JSON-RPC method -> handler(request_id, params)
+HANDLERS = {
+    "initialize": handle_initialize,
+    "notifications/initialized": handle_initialized,
+    "tools/list": handle_tools_list,
+    "tools/call": handle_tools_call,
+}
 
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {
-                    "content": [{"type": "text", "text": response_text}]
-                }
-            }
-        else:
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32601,
-                    "message": f"Unknown tool: {tool_name}"
-                }
-            }
 
-    else:
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "error": {
-                "code": -32601,
-                "message": f"Method not found: {method}"
-            }
+def handle_request(request: dict) -> dict:
+    """Handle an MCP JSON-RPC request."""
+    method = request.get("method", "")
+    request_id = request.get("id")
+
+    handler = HANDLERS.get(method) if isinstance(method, str) else None
+    if handler is not None:
+        return handler(request_id, request.get("params", {}))
+
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": -32601,
+            "message": f"Method not found: {method}"
         }
+    }
+
+
+def write_message(out, message: dict) -> None:
+    """Write one JSON-RPC message as a line of bytes and flush it."""
+    out.write(json_dumps(message))
+    out.write(b"\n")
+    out.flush()
 
 
 def main():
     """Main loop - read JSON-RPC messages from stdin, write responses to stdout."""
-    # Unbuffered output
-    sys.stdout = open(sys.stdout.fileno(), mode='w', buffering=1)
+    out = sys.stdout.buffer
+    # Read raw bytes; json_loads parses them without a str decode step
+    readline = sys.stdin.buffer.readline
 
-    for line in sys.stdin:
+    while True:
+        line = readline()
+        if not line:
+            break
         line = line.strip()
         if not line:
             continue
 
         try:
-            request = json.loads(line)
+            request = json_loads(line)
+
+            method = request.get("method")
+            suffix = STATIC_RESPONSE_SUFFIXES.get(method) if isinstance(method, str) else None
+            if suffix is not None:
+                out.write(RESPONSE_PREFIX + json_dumps(request.get("id")) + suffix)
+                out.flush()
+                continue
+
             response = handle_request(request)
 
             if response is not None:
-                print(json.dumps(response), flush=True)
+                write_message(out, response)
 
         except json.JSONDecodeError as e:
             error_response = {
@@ -201,7 +275,7 @@ def main():
                     "message": f"Parse error: {str(e)}"
                 }
             }
-            print(json.dumps(error_response), flush=True)
+            write_message(out, error_response)
         except Exception as e:
             error_response = {
                 "jsonrpc": "2.0",
@@ -211,7 +285,7 @@ def main():
                     "message": f"Internal error: {str(e)}"
                 }
             }
-            print(json.dumps(error_response), flush=True)
+            write_message(out, error_response)
 
 
 if __name__ == "__main__":
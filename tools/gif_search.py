@@ -18,15 +18,13 @@ import urllib.request
 import urllib.parse
 from pathlib import Path
 
+try:
+    from _env import load_env
+except ImportError:
+    from tools._env import load_env
+
 # Load .env file from project root
-env_path = Path(__file__).parent.parent / ".env"
-if env_path.exists():
-    with open(env_path) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                key, value = line.split("=", 1)
-                os.environ.setdefault(key.strip(), value.strip())
+load_env(Path(__file__).parent.parent / ".env")
 
 GIPHY_API_KEY = os.environ.get("GIPHY_API_KEY")
 
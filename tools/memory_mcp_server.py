@@ -12,13 +12,22 @@ The server reads JSON-RPC messages from stdin and writes responses to stdout.
 """
 
 import argparse
+import asyncio
 import json
+import mmap
 import os
+import re
 import shutil
 import sys
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-
+try:
+    from _json_codec import json_dumps, json_dumps_line, json_loads
+except ImportError:
+    from tools._json_codec import json_dumps, json_dumps_line, json_loads
 
 
 def get_memory_tools():
@@ -38,6 +47,10 @@ def get_memory_tools():
                         "type": "array",
                         "items": {"type": "integer"},
                         "description": "Optional [start_line, end_line] to view specific lines (1-indexed)"
+                    },
+                    "include_sizes": {
+                        "type": "boolean",
+                        "description": "When listing a directory, show file sizes (default true). Set false for faster listings of large directories."
                     }
                 },
                 "required": ["path"]
@@ -140,29 +153,153 @@ def get_memory_tools():
     ]
 
 
+# The tool schemas are static; build them once
+MEMORY_TOOLS = get_memory_tools()
+
+INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {}
+    },
+    "serverInfo": {
+        "name": "memory",
+        "version": "1.0.0"
+    }
+}
+
+# Pre-serialized responses for static methods; main() splices the request
+# id between RESPONSE_PREFIX and the method's suffix
+RESPONSE_PREFIX = b'{"jsonrpc":"2.0","id":'
+STATIC_RESPONSE_SUFFIXES = {
+    "initialize": b',"result":' + json_dumps(INITIALIZE_RESULT) + b'}\n',
+    "tools/list": b',"result":' + json_dumps({"tools": MEMORY_TOOLS}) + b'}\n',
+}
+
+# Error envelopes for lines that never became a request; %-format with the
+# JSON-encoded message
+PARSE_ERROR_TEMPLATE = b'{"jsonrpc":"2.0","id":null,"error":{"code":-32700,"message":%s}}\n'
+INTERNAL_ERROR_TEMPLATE = b'{"jsonrpc":"2.0","id":null,"error":{"code":-32603,"message":%s}}\n'
+
+
+# Strips the /memories prefix (or a bare leading slash) from virtual paths
+_STRIP_RE = re.compile(r"^/memories/?|^/")
+
+# Max directory listings kept by MemoryServer's listing cache
+LISTING_CACHE_SIZE = 128
+# Max virtual paths memoized by MemoryServer._resolve_path
+RESOLVE_CACHE_SIZE = 1024
+# Max responses queued (ready or in progress) ahead of the stdout writer
+PIPELINE_DEPTH = 64
+# view() reads line ranges of files larger than this through mmap
+MMAP_VIEW_THRESHOLD = 8 * 1024 * 1024
+MMAP_COUNT_CHUNK = 1 << 20
+# create() encodes texts longer than this (in chars) slice by slice
+CHUNKED_WRITE_THRESHOLD = 4 * 1024 * 1024
+WRITE_CHUNK_CHARS = 1 << 20
+
+
 class MemoryServer:
     """MCP server for memory operations."""
 
-    def __init__(self, memory_base_path: str):
-        """Initialize with the base path for memories."""
+    def __init__(self, memory_base_path: str, cache_listings: bool = True):
+        """Initialize with the base path for memories.
+
+        Directory listings are cached (LRU) and revalidated against the
+        mtimes of every directory they cover, which catches entries added,
+        removed or renamed by any process. Pass cache_listings=False if
+        memory files may be rewritten in place by something other than a
+        MemoryServer, since that wouldn't show up in the sizes.
+        """
         # Convert to absolute path and resolve
         self.memory_base_path = Path(memory_base_path).resolve()
         self.memory_base_path.mkdir(parents=True, exist_ok=True)
+        # String forms of the base for the containment check in _resolve_path
+        self._base_str = str(self.memory_base_path)
+        self._base_prefix = os.path.join(self._base_str, "")
+        # Listings show paths relative to the base's parent; entry paths are
+        # sliced past its string form (join adds a separator unless it's "/")
+        self._rel_start = len(os.path.join(str(self.memory_base_path.parent), ""))
+        # virtual path -> resolved real path
+        self._resolved_paths = {}
+        # (real_path, include_sizes) -> (((dir, mtime_ns), ...), listing lines)
+        self._listing_cache = OrderedDict() if cache_listings else None
+        # tools/call name -> handler taking the call's arguments dict
+        self._dispatch = {
+            "memory_view": lambda a: self.view(
+                path=a.get("path", "/memories"),
+                view_range=a.get("view_range"),
+                include_sizes=a.get("include_sizes", True)
+            ),
+            "memory_create": lambda a: self.create(
+                path=a.get("path", ""),
+                file_text=a.get("file_text", "")
+            ),
+            "memory_str_replace": lambda a: self.str_replace(
+                path=a.get("path", ""),
+                old_str=a.get("old_str", ""),
+                new_str=a.get("new_str", "")
+            ),
+            "memory_insert": lambda a: self.insert(
+                path=a.get("path", ""),
+                insert_line=a.get("insert_line", 0),
+                insert_text=a.get("insert_text", "")
+            ),
+            "memory_delete": lambda a: self.delete(
+                path=a.get("path", "")
+            ),
+            "memory_rename": lambda a: self.rename(
+                old_path=a.get("old_path", ""),
+                new_path=a.get("new_path", "")
+            ),
+        }
+
+    def _invalidate_listings(self) -> None:
+        """Drop cached directory listings after a write."""
+        if self._listing_cache:
+            self._listing_cache.clear()
+
+    def _cached_listing(self, real_path: Path, include_sizes: bool):
+        """Cached listing lines for a directory, or None if missing or stale."""
+        if self._listing_cache is None:
+            return None
+        cached = self._listing_cache.get((real_path, include_sizes))
+        if cached is None:
+            return None
+
+        dir_mtimes, listing = cached
+        try:
+            if any(os.stat(d).st_mtime_ns != mtime for d, mtime in dir_mtimes):
+                return None
+        except OSError:
+            return None
+
+        self._listing_cache.move_to_end((real_path, include_sizes))
+        return listing
+
+    def _store_listing(self, real_path: Path, include_sizes: bool, dir_mtimes: tuple, listing: list) -> None:
+        """Remember a directory listing, evicting the least recently used."""
+        if self._listing_cache is None:
+            return
+        self._listing_cache[(real_path, include_sizes)] = (dir_mtimes, listing)
+        if len(self._listing_cache) > LISTING_CACHE_SIZE:
+            self._listing_cache.popitem(last=False)
 
     def _resolve_path(self, virtual_path: str) -> Path:
         """Resolve a virtual path (/memories/...) to a real path.
 
         Security: Validates path is within memory directory.
+        Results are memoized per virtual path; rejected paths are not.
         """
-        # Remove /memories prefix if present
-        if virtual_path.startswith("/memories"):
-            relative = virtual_path[9:]  # Remove "/memories"
-        else:
-            relative = virtual_path
+        # The base itself is the most common target and is already resolved
+        if virtual_path == "/memories" or virtual_path == "/memories/" or not virtual_path:
+            return self.memory_base_path
+
+        cached = self._resolved_paths.get(virtual_path)
+        if cached is not None:
+            return cached
 
-        # Remove leading slash
-        if relative.startswith("/"):
-            relative = relative[1:]
+        # Remove /memories prefix and leading slash
+        relative = _STRIP_RE.sub("", virtual_path, count=1)
 
         # Resolve to real path
         if relative:
@@ -171,11 +308,13 @@ class MemoryServer:
             real_path = self.memory_base_path.resolve()
 
         # Security check: ensure path is within memory directory
-        try:
-            real_path.relative_to(self.memory_base_path)
-        except ValueError:
+        real_str = str(real_path)
+        if real_str != self._base_str and not real_str.startswith(self._base_prefix):
             raise ValueError(f"Path traversal attempt detected: {virtual_path}")
 
+        if len(self._resolved_paths) >= RESOLVE_CACHE_SIZE:
+            self._resolved_paths.clear()
+        self._resolved_paths[virtual_path] = real_path
         return real_path
 
     def _format_size(self, size: int) -> str:
@@ -187,8 +326,96 @@ class MemoryServer:
         else:
             return f"{size / (1024 * 1024):.1f}M"
 
-    def view(self, path: str, view_range: list = None) -> str:
-        """View a file or directory."""
+    @staticmethod
+    def _match_line_numbers(content: str, old_str: str) -> list:
+        """Line numbers (1-indexed, deduplicated) where old_str occurrences start."""
+        line_nums = []
+        line = 1
+        last = 0
+        pos = content.find(old_str)
+        while pos >= 0:
+            line += content.count('\n', last, pos)
+            last = pos
+            if not line_nums or line_nums[-1] != line:
+                line_nums.append(line)
+            # Step at least one char so an empty old_str can't loop forever
+            pos = content.find(old_str, pos + max(len(old_str), 1))
+        return line_nums
+
+    @staticmethod
+    def _write_atomic(real_path: Path, text: str) -> None:
+        """Replace a file's contents via a temp file and os.replace.
+
+        A crash mid-write leaves the old file intact instead of truncated.
+        """
+        data = text.encode('utf-8')
+        mode = os.stat(real_path).st_mode & 0o7777
+        fd, tmp_path = tempfile.mkstemp(dir=real_path.parent, prefix=f".{real_path.name}.")
+        try:
+            with open(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, real_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _read_line_range(real_path: Path, start: int, stop: int) -> tuple:
+        """Read lines [start, stop) of a large file through mmap.
+
+        Only the requested span is decoded, so lines outside it never become
+        strings. Returns (lines, total line count). Lines are split on LF
+        only, with CRLF treated as LF, so bare-CR line endings aren't split
+        here as they are in text mode, and bytes outside the span aren't
+        checked for valid UTF-8.
+
+        Raises:
+            UnicodeDecodeError: if the span isn't valid UTF-8
+        """
+        with open(real_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = 0
+            for _ in range(start):
+                pos = mm.find(b"\n", pos) + 1
+                if not pos:
+                    pos = size
+                    break
+            span_start = pos
+            for _ in range(stop - start):
+                pos = mm.find(b"\n", pos) + 1
+                if not pos:
+                    pos = size
+                    break
+            text = mm[span_start:pos].decode('utf-8')
+
+            n_lines = 0
+            for i in range(0, size, MMAP_COUNT_CHUNK):
+                n_lines += mm[i:i + MMAP_COUNT_CHUNK].count(b"\n")
+            if size and mm[size - 1] != ord("\n"):
+                n_lines += 1
+
+        # Split on LF alone so the lines agree with n_lines
+        lines = text.replace("\r\n", "\n").split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        return lines, n_lines
+
+    @staticmethod
+    def _scan_sorted(dir_path) -> list:
+        """Directory entries sorted by name; empty if unreadable."""
+        try:
+            with os.scandir(dir_path) as it:
+                return sorted(it, key=lambda entry: entry.name)
+        except PermissionError:
+            return []
+
+    def view(self, path: str, view_range: list = None, include_sizes: bool = True) -> str:
+        """View a file or directory.
+
+        Directory listings skip the per-file stat when include_sizes is False.
+        """
         try:
             real_path = self._resolve_path(path)
         except ValueError as e:
@@ -201,62 +428,83 @@ class MemoryServer:
             # List directory contents (up to 2 levels deep)
             lines = [f"Here're the files and directories up to 2 levels deep in {path}, excluding hidden items and node_modules:"]
 
-            def list_dir(dir_path: Path, prefix: str, depth: int):
-                if depth > 2:
-                    return
+            listing = self._cached_listing(real_path, include_sizes)
+            if listing is not None:
+                return "\n".join(lines + listing)
+
+            # Add the directory itself
+            rel_start = self._rel_start
+            lines.append(f"4.0K\t/{str(real_path)[rel_start:]}")
+
+            # Depth-first walk with an explicit stack of sorted scandir
+            # listings; DirEntry caches file types from the directory read.
+            # Each scanned directory's mtime is recorded (before scanning)
+            # to validate the cached listing later.
+            dir_mtimes = [(str(real_path), os.stat(real_path).st_mtime_ns)]
+            stack = [iter(self._scan_sorted(real_path))]
+            while stack:
+                entry = next(stack[-1], None)
+                if entry is None:
+                    stack.pop()
+                    continue
+
+                # Skip hidden files and node_modules
+                if entry.name.startswith('.') or entry.name == 'node_modules':
+                    continue
+
                 try:
-                    items = sorted(dir_path.iterdir())
-                    for item in items:
-                        # Skip hidden files and node_modules
-                        if item.name.startswith('.') or item.name == 'node_modules':
-                            continue
-
-                        if item.is_file():
-                            size = self._format_size(item.stat().st_size)
-                            rel_path = "/" + str(item.relative_to(self.memory_base_path.parent))
-                            lines.append(f"{size}\t{rel_path}")
-                        elif item.is_dir():
-                            rel_path = "/" + str(item.relative_to(self.memory_base_path.parent))
-                            lines.append(f"4.0K\t{rel_path}")
-                            list_dir(item, prefix, depth + 1)
+                    if entry.is_file():
+                        size = self._format_size(entry.stat().st_size) if include_sizes else "-"
+                        lines.append(f"{size}\t/{entry.path[rel_start:]}")
+                    elif entry.is_dir():
+                        lines.append(f"4.0K\t/{entry.path[rel_start:]}")
+                        if len(stack) < 2:
+                            dir_mtimes.append((entry.path, os.stat(entry.path).st_mtime_ns))
+                            stack.append(iter(self._scan_sorted(entry.path)))
                 except PermissionError:
                     pass
 
-            # Add the directory itself
-            rel_path = "/" + str(real_path.relative_to(self.memory_base_path.parent))
-            lines.append(f"4.0K\t{rel_path}")
-            list_dir(real_path, "", 1)
+            self._store_listing(real_path, include_sizes, tuple(dir_mtimes), lines[1:])
 
             return "\n".join(lines)
         else:
-            # Read file contents
+            # Apply view_range if specified
+            start, end = 0, None
+            if view_range and len(view_range) == 2:
+                start = max(1, view_range[0]) - 1  # Convert to 0-indexed
+                end = view_range[1]
+            # A negative end counts back from the last line, so it needs every line
+            keep_to = end if end is None or end >= 0 else None
+
             try:
-                with open(real_path, 'r', encoding='utf-8') as f:
-                    file_lines = f.readlines()
+                if keep_to is not None and real_path.stat().st_size > MMAP_VIEW_THRESHOLD:
+                    file_lines, n_lines = self._read_line_range(real_path, start, keep_to)
+                else:
+                    # Stream the file, keeping only lines in range but counting them all
+                    file_lines = []
+                    n_lines = 0
+                    with open(real_path, 'r', encoding='utf-8') as f:
+                        for n_lines, line in enumerate(f, 1):
+                            if n_lines > start and (keep_to is None or n_lines <= keep_to):
+                                file_lines.append(line)
             except UnicodeDecodeError:
                 return f"Error: {path} is a binary file and cannot be displayed."
 
-            if len(file_lines) > 999999:
+            if n_lines > 999999:
                 return f"File {path} exceeds maximum line limit of 999,999 lines."
 
-            # Apply view_range if specified
-            if view_range and len(view_range) == 2:
-                start, end = view_range
-                start = max(1, start) - 1  # Convert to 0-indexed
-                end = min(len(file_lines), end)
-                file_lines = file_lines[start:end]
-                line_offset = start
-            else:
-                line_offset = 0
-
-            # Format with line numbers (6 chars, right-aligned, tab separator)
-            formatted_lines = [f"Here's the content of {path} with line numbers:"]
-            for i, line in enumerate(file_lines, start=line_offset + 1):
-                # Remove trailing newline for formatting
-                line_content = line.rstrip('\n')
-                formatted_lines.append(f"{i:6d}\t{line_content}")
+            if keep_to is None and end is not None:
+                file_lines = file_lines[:end]
+            line_offset = start
 
-            return "\n".join(formatted_lines)
+            # Format with line numbers (6 chars, right-aligned, tab separator),
+            # dropping each line's trailing newline
+            body = "\n".join([
+                "%6d\t%s" % (i, line[:-1] if line[-1:] == "\n" else line)
+                for i, line in enumerate(file_lines, line_offset + 1)
+            ])
+            header = f"Here's the content of {path} with line numbers:"
+            return f"{header}\n{body}" if file_lines else header
 
     def create(self, path: str, file_text: str) -> str:
         """Create a new file."""
@@ -270,10 +518,16 @@ class MemoryServer:
 
         # Create parent directories if needed
         real_path.parent.mkdir(parents=True, exist_ok=True)
+        self._invalidate_listings()
 
         try:
-            with open(real_path, 'w', encoding='utf-8') as f:
-                f.write(file_text)
+            with open(real_path, 'wb') as f:
+                if len(file_text) > CHUNKED_WRITE_THRESHOLD:
+                    # Encode in slices so peak memory stays near the text's own size
+                    for i in range(0, len(file_text), WRITE_CHUNK_CHARS):
+                        f.write(file_text[i:i + WRITE_CHUNK_CHARS].encode('utf-8'))
+                else:
+                    f.write(file_text.encode('utf-8'))
             return f"File created successfully at: {path}"
         except Exception as e:
             return f"Error creating file: {e}"
@@ -297,27 +551,22 @@ class MemoryServer:
         except Exception as e:
             return f"Error reading file: {e}"
 
-        # Count occurrences
-        count = content.count(old_str)
+        # Find the first occurrence, then just check whether a second exists
+        first = content.find(old_str)
 
-        if count == 0:
+        if first < 0:
             return f"No replacement was performed, old_str `{old_str}` did not appear verbatim in {path}."
 
-        if count > 1:
-            # Find line numbers of occurrences
-            lines = content.split('\n')
-            line_nums = []
-            for i, line in enumerate(lines, 1):
-                if old_str in line:
-                    line_nums.append(str(i))
+        if content.find(old_str, first + max(len(old_str), 1)) >= 0:
+            line_nums = [str(n) for n in self._match_line_numbers(content, old_str)]
             return f"No replacement was performed. Multiple occurrences of old_str `{old_str}` in lines: {', '.join(line_nums)}. Please ensure it is unique"
 
         # Perform replacement
-        new_content = content.replace(old_str, new_str, 1)
+        new_content = content[:first] + new_str + content[first + len(old_str):]
 
+        self._invalidate_listings()
         try:
-            with open(real_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            self._write_atomic(real_path, new_content)
         except Exception as e:
             return f"Error writing file: {e}"
 
@@ -364,9 +613,11 @@ class MemoryServer:
 
         lines.insert(insert_line, insert_text)
 
+        self._invalidate_listings()
         try:
-            with open(real_path, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
+            # Atomic replace also bumps the directory mtime, so listing
+            # caches in other server processes notice the size change
+            self._write_atomic(real_path, "".join(lines))
             return f"The file {path} has been edited."
         except Exception as e:
             return f"Error writing file: {e}"
@@ -382,9 +633,12 @@ class MemoryServer:
             return f"Error: The path {path} does not exist"
 
         # Prevent deleting the memories root
-        if real_path.resolve() == self.memory_base_path.resolve():
+        # _resolve_path already returns resolved paths
+        if real_path == self.memory_base_path:
             return "Error: Cannot delete the memories root directory"
 
+        self._invalidate_listings()
+        self._resolved_paths.clear()
         try:
             if real_path.is_file():
                 real_path.unlink()
@@ -410,6 +664,8 @@ class MemoryServer:
 
         # Create parent directories if needed
         real_new.parent.mkdir(parents=True, exist_ok=True)
+        self._invalidate_listings()
+        self._resolved_paths.clear()
 
         try:
             real_old.rename(real_new)
@@ -428,16 +684,7 @@ def handle_request(server: MemoryServer, request: dict) -> dict:
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {}
-                },
-                "serverInfo": {
-                    "name": "memory",
-                    "version": "1.0.0"
-                }
-            }
+            "result": INITIALIZE_RESULT
         }
 
     elif method == "notifications/initialized":
@@ -448,7 +695,7 @@ def handle_request(server: MemoryServer, request: dict) -> dict:
             "jsonrpc": "2.0",
             "id": request_id,
             "result": {
-                "tools": get_memory_tools()
+                "tools": MEMORY_TOOLS
             }
         }
 
@@ -456,50 +703,21 @@ def handle_request(server: MemoryServer, request: dict) -> dict:
         tool_name = params.get("name", "")
         arguments = params.get("arguments", {})
 
-        result_text = ""
+        handler = server._dispatch.get(tool_name)
+        if handler is None:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": -32601,
+                    "message": f"Unknown tool: {tool_name}"
+                }
+            }
+
         is_error = False
 
         try:
-            if tool_name == "memory_view":
-                result_text = server.view(
-                    path=arguments.get("path", "/memories"),
-                    view_range=arguments.get("view_range")
-                )
-            elif tool_name == "memory_create":
-                result_text = server.create(
-                    path=arguments.get("path", ""),
-                    file_text=arguments.get("file_text", "")
-                )
-            elif tool_name == "memory_str_replace":
-                result_text = server.str_replace(
-                    path=arguments.get("path", ""),
-                    old_str=arguments.get("old_str", ""),
-                    new_str=arguments.get("new_str", "")
-                )
-            elif tool_name == "memory_insert":
-                result_text = server.insert(
-                    path=arguments.get("path", ""),
-                    insert_line=arguments.get("insert_line", 0),
-                    insert_text=arguments.get("insert_text", "")
-                )
-            elif tool_name == "memory_delete":
-                result_text = server.delete(
-                    path=arguments.get("path", "")
-                )
-            elif tool_name == "memory_rename":
-                result_text = server.rename(
-                    old_path=arguments.get("old_path", ""),
-                    new_path=arguments.get("new_path", "")
-                )
-            else:
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Unknown tool: {tool_name}"
-                    }
-                }
+            result_text = handler(arguments)
 
             # Check if result indicates an error
             if result_text.startswith("Error:"):
@@ -529,53 +747,162 @@ def handle_request(server: MemoryServer, request: dict) -> dict:
         }
 
 
-def main():
-    """Main loop - read JSON-RPC messages from stdin, write responses to stdout."""
-    parser = argparse.ArgumentParser(description="Memory MCP Server")
-    parser.add_argument(
-        "--memory-path",
-        required=True,
-        help="Base path for memory storage"
-    )
-    args = parser.parse_args()
-
-    server = MemoryServer(args.memory_path)
-
-    # Unbuffered output
-    sys.stdout = open(sys.stdout.fileno(), mode='w', buffering=1)
+def handle_batch(server: MemoryServer, requests: list):
+    """Handle a JSON-RPC batch.
 
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
-
-        try:
-            request = json.loads(line)
-            response = handle_request(server, request)
-
-            if response is not None:
-                print(json.dumps(response), flush=True)
+    Each entry is handled independently and notifications produce no
+    response. Returns the list of responses, a single error for an
+    empty batch, or None when there is nothing to send back.
+    """
+    if not requests:
+        return {
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {
+                "code": -32600,
+                "message": "Invalid Request: empty batch"
+            }
+        }
 
-        except json.JSONDecodeError as e:
-            error_response = {
+    responses = []
+    for request in requests:
+        if not isinstance(request, dict):
+            responses.append({
                 "jsonrpc": "2.0",
                 "id": None,
                 "error": {
-                    "code": -32700,
-                    "message": f"Parse error: {str(e)}"
+                    "code": -32600,
+                    "message": "Invalid Request"
                 }
-            }
-            print(json.dumps(error_response), flush=True)
+            })
+            continue
+        try:
+            response = handle_request(server, request)
         except Exception as e:
-            error_response = {
+            response = {
                 "jsonrpc": "2.0",
-                "id": None,
+                "id": request.get("id"),
                 "error": {
                     "code": -32603,
                     "message": f"Internal error: {str(e)}"
                 }
             }
-            print(json.dumps(error_response), flush=True)
+        if response is not None:
+            responses.append(response)
+
+    return responses or None
+
+
+def prepare_line(line: bytes):
+    """Decode one non-empty input line.
+
+    Returns (response_bytes, None) when the reply needs no server work
+    (static methods, parse errors), otherwise (None, request).
+    """
+    try:
+        request = json_loads(line)
+    except json.JSONDecodeError as e:
+        return PARSE_ERROR_TEMPLATE % json_dumps(f"Parse error: {str(e)}"), None
+
+    if isinstance(request, dict) and isinstance(method := request.get("method"), str):
+        suffix = STATIC_RESPONSE_SUFFIXES.get(method)
+        if suffix is not None:
+            return RESPONSE_PREFIX + json_dumps(request.get("id")) + suffix, None
+
+    return None, request
+
+
+def respond(server: MemoryServer, request) -> bytes:
+    """Handle a decoded request or batch; returns the response line (b"" if none)."""
+    try:
+        if isinstance(request, list):
+            response = handle_batch(server, request)
+        else:
+            response = handle_request(server, request)
+        return b"" if response is None else json_dumps_line(response)
+    except Exception as e:
+        return INTERNAL_ERROR_TEMPLATE % json_dumps(f"Internal error: {str(e)}")
+
+
+async def write_responses(queue: asyncio.Queue, out) -> None:
+    """Write queued responses in arrival order.
+
+    Items are response bytes or futures resolving to them; None ends the
+    stream. Output is flushed when the queue drains and before waiting on a
+    future that isn't done, so finished responses never sit behind a slow one.
+    """
+    while (item := await queue.get()) is not None:
+        if not isinstance(item, bytes):
+            if not item.done():
+                out.flush()
+            item = await item
+        out.write(item)
+        if queue.empty():
+            out.flush()
+    out.flush()
+
+
+async def serve(server: MemoryServer, stdin, out) -> None:
+    """Read requests from stdin and answer them on out.
+
+    Lines are read on a helper thread and decoded on the event loop while
+    the server handles earlier requests on its own worker thread. There is
+    a single worker, so requests still run one at a time and in order.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+    writer = asyncio.create_task(write_responses(queue, out))
+
+    # If writing fails (e.g. the client closed stdout) nothing drains the
+    # queue any more, so stop reading instead of blocking on a full queue
+    serve_task = asyncio.current_task()
+    writer.add_done_callback(
+        lambda task: task.cancelled() or task.exception() is None or serve_task.cancel()
+    )
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            while line := await asyncio.to_thread(stdin.readline):
+                line = line.strip()
+                if not line:
+                    continue
+                ready, request = prepare_line(line)
+                if ready is None:
+                    ready = loop.run_in_executor(executor, respond, server, request)
+                await queue.put(ready)
+
+            await queue.put(None)
+    except asyncio.CancelledError:
+        if writer.done() and not writer.cancelled() and writer.exception() is not None:
+            raise writer.exception() from None
+        raise
+    await writer
+
+
+def main():
+    """Main loop - read JSON-RPC messages from stdin, write responses to stdout."""
+    parser = argparse.ArgumentParser(description="Memory MCP Server")
+    parser.add_argument(
+        "--memory-path",
+        required=True,
+        help="Base path for memory storage"
+    )
+    parser.add_argument(
+        "--no-listing-cache",
+        action="store_true",
+        help="Rebuild directory listings on every view (if memory files are edited in place externally)"
+    )
+    args = parser.parse_args()
+
+    server = MemoryServer(args.memory_path, cache_listings=not args.no_listing_cache)
+
+    try:
+        asyncio.run(serve(server, sys.stdin.buffer, sys.stdout.buffer))
+    except BrokenPipeError:
+        # The client stopped reading; point stdout at devnull so the flush
+        # at exit doesn't fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -13,12 +13,28 @@ The server reads JSON-RPC messages from stdin and writes responses to stdout.
 """
 
 import argparse
+import asyncio
+import atexit
 import json
+import locale
 import os
+import secrets
+import selectors
+import signal
+import socket
+import stat
+import subprocess
 import sys
-import uuid
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
+
+try:
+    from _json_codec import json_dumps, json_dumps_line, json_loads
+except ImportError:
+    from tools._json_codec import json_dumps, json_dumps_line, json_loads
 
 
 def get_surface_tools():
@@ -179,6 +195,246 @@ th { background: #F4F3EE; }
     ]
 
 
+# The tool schemas are static; build them once
+SURFACE_TOOLS = get_surface_tools()
+TOOLS_LIST_RESULT = {"tools": SURFACE_TOOLS}
+
+# Serialized tools/list response around the request id, spliced by main()
+TOOLS_LIST_RESPONSE_PREFIX = b'{"jsonrpc":"2.0","id":'
+TOOLS_LIST_RESPONSE_SUFFIX = b',"result":' + json_dumps(TOOLS_LIST_RESULT) + b'}\n'
+
+# tools/call response around the request id and the text's JSON string
+# literal, for surface data that is already serialized
+SURFACE_RESPONSE_PREFIX = b'{"jsonrpc":"2.0","id":'
+SURFACE_RESPONSE_MIDDLE = b',"result":{"content":[{"type":"text","text":"'
+SURFACE_RESPONSE_SUFFIX = b'"}],"isError":false}}\n'
+
+# Error envelopes for lines that never became a request; %-format with the
+# JSON-encoded message
+PARSE_ERROR_TEMPLATE = b'{"jsonrpc":"2.0","id":null,"error":{"code":-32700,"message":%s}}\n'
+INTERNAL_ERROR_TEMPLATE = b'{"jsonrpc":"2.0","id":null,"error":{"code":-32603,"message":%s}}\n'
+
+# Longest input line accepted; longer ones get a parse error unread
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+# Yielded by read_frames in place of a line over MAX_FRAME_BYTES
+OVERSIZED_FRAME = object()
+OVERSIZED_FRAME_ERROR = PARSE_ERROR_TEMPLATE % json_dumps(
+    f"Parse error: message exceeds {MAX_FRAME_BYTES} bytes"
+)
+
+
+# Max workspace files kept by SurfaceServer's read cache, and the largest
+# file it will hold
+READ_CACHE_SIZE = 128
+READ_CACHE_MAX_BYTES = 4 * 1024 * 1024
+# Seconds workspace_write holds writes so bursts to a file coalesce
+WRITE_FLUSH_DELAY = 0.05
+
+# Max requests handled at once (a slow script doesn't hold up the rest)
+MAX_CONCURRENT_CALLS = 8
+
+# Interpreters surface_from_script picks by script extension
+INTERPRETER_MAP = {
+    '.py': 'python3',
+    '.js': 'node',
+    '.sh': 'bash',
+    '.rb': 'ruby',
+    '.pl': 'perl',
+    '.php': 'php',
+}
+
+# Seconds a surface_from_script run may take
+SCRIPT_TIMEOUT = 30
+ZYGOTE_PATH = Path(__file__).parent / "_script_zygote.py"
+# Space reserved per read of a script's output pipe (the Linux pipe size)
+PIPE_READ_CHUNK = bytes(65536)
+
+
+def read_pipes(out_fd: int, err_fd: int, timeout: float) -> tuple:
+    """Read two pipe fds to EOF as the child writes them.
+
+    Each stream is read straight into the tail of its own growing
+    bytearray (readv), so there are no per-chunk bytes objects or final
+    join. Returns (stdout, stderr) bytearrays.
+
+    Raises:
+        subprocess.TimeoutExpired: if both aren't closed within timeout
+    """
+    deadline = time.monotonic() + timeout
+    bufs = {out_fd: bytearray(), err_fd: bytearray()}
+    with selectors.DefaultSelector() as sel:
+        for fd in bufs:
+            sel.register(fd, selectors.EVENT_READ)
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired("script", timeout)
+            for key, _ in sel.select(remaining):
+                buf = bufs[key.fd]
+                start = len(buf)
+                buf += PIPE_READ_CHUNK
+                with memoryview(buf)[start:] as tail:
+                    n = os.readv(key.fd, [tail])
+                del buf[start + n:]
+                if not n:
+                    sel.unregister(key.fd)
+    return bufs[out_fd], bufs[err_fd]
+
+
+def spawn_script(cmd: list, timeout: float) -> tuple:
+    """Run cmd via posix_spawnp with piped output, in the current directory.
+
+    Skips subprocess's fork/exec and fd-closing machinery; our own fds are
+    non-inheritable anyway. stdin is /dev/null. Returns (returncode,
+    stdout, stderr) with the output as bytearrays.
+
+    Raises:
+        subprocess.TimeoutExpired: if cmd runs past timeout (it is killed)
+    """
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    try:
+        try:
+            pid = os.posix_spawnp(cmd[0], cmd, os.environ, file_actions=[
+                (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+                (os.POSIX_SPAWN_DUP2, out_w, 1),
+                (os.POSIX_SPAWN_DUP2, err_w, 2),
+            ])
+        finally:
+            os.close(out_w)
+            os.close(err_w)
+
+        try:
+            stdout, stderr = read_pipes(out_r, err_r, timeout)
+        except subprocess.TimeoutExpired:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            raise
+        _, status = os.waitpid(pid, 0)
+        return os.waitstatus_to_exitcode(status), stdout, stderr
+    finally:
+        os.close(out_r)
+        os.close(err_r)
+
+
+def decode_output(data) -> str:
+    """Decode captured script output the way subprocess's text mode does."""
+    text = data.decode(locale.getpreferredencoding(False))
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+class ZygoteUnavailable(Exception):
+    """The script zygote can't take this job; run it another way."""
+
+
+class ScriptZygote:
+    """Client for the forking Python process in _script_zygote.py.
+
+    Runs one job at a time. POSIX only: the job's pipes are handed over
+    with SCM_RIGHTS on a SOCK_SEQPACKET socketpair.
+    """
+
+    def __init__(self, interpreter: str):
+        """Start the zygote under the given Python interpreter."""
+        parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            self._proc = subprocess.Popen(
+                [interpreter, str(ZYGOTE_PATH), str(child.fileno())],
+                pass_fds=(child.fileno(),),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL
+            )
+        except BaseException:
+            parent.close()
+            raise
+        finally:
+            child.close()
+        self._sock = parent
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the zygote can still take jobs."""
+        return self._sock is not None
+
+    def close(self) -> None:
+        """Shut the zygote down; closing the socket makes it exit."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        try:
+            self._proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+
+    def _recv(self) -> dict:
+        """Receive one reply from the zygote."""
+        if self._sock is None:
+            raise ZygoteUnavailable("script zygote exited")
+        try:
+            msg = self._sock.recv(4096)
+        except OSError:
+            msg = b""
+        if not msg:
+            self.close()
+            raise ZygoteUnavailable("script zygote exited")
+        return json_loads(msg)
+
+    def run(self, script: str, args: list, cwd: str, timeout: float) -> tuple:
+        """Run a Python script in a forked child.
+
+        Returns (returncode, stdout, stderr) with the output as bytearrays.
+
+        Raises:
+            ZygoteUnavailable: if the job couldn't be started
+            subprocess.TimeoutExpired: if the script outlived timeout (it is killed)
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ZygoteUnavailable("script zygote is busy")
+        try:
+            if self._sock is None:
+                raise ZygoteUnavailable("script zygote exited")
+
+            out_r, out_w = os.pipe()
+            err_r, err_w = os.pipe()
+            try:
+                try:
+                    job = json_dumps({"script": script, "args": args, "cwd": cwd})
+                    socket.send_fds(self._sock, [job], [out_w, err_w])
+                except OSError as e:
+                    self.close()
+                    raise ZygoteUnavailable(str(e))
+                finally:
+                    os.close(out_w)
+                    os.close(err_w)
+                pid = self._recv()["pid"]
+
+                try:
+                    stdout, stderr = read_pipes(out_r, err_r, timeout)
+                except subprocess.TimeoutExpired:
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                    try:
+                        self._recv()
+                    except ZygoteUnavailable:
+                        pass
+                    raise
+
+                # The script already ran, so a zygote dying now can't fall back
+                try:
+                    returncode = self._recv()["returncode"]
+                except ZygoteUnavailable:
+                    returncode = -1
+                return returncode, stdout, stderr
+            finally:
+                os.close(out_r)
+                os.close(err_r)
+        finally:
+            self._lock.release()
+
+
 class SurfaceServer:
     """MCP server for surfacing content to users."""
 
@@ -187,6 +443,22 @@ class SurfaceServer:
         self.workspace_path = Path(workspace_path).resolve()
         self.conversation_id = conversation_id
         self.workspace_path.mkdir(parents=True, exist_ok=True)
+        # String forms of the workspace for the containment check in _resolve_path
+        self._workspace_str = str(self.workspace_path)
+        self._workspace_prefix = os.path.join(self._workspace_str, "")
+        # real path -> ((mtime_ns, size), text) for recently read files
+        self._read_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # real path -> text written by workspace_write but not yet on disk
+        self._pending_writes = {}
+        self._write_lock = threading.Lock()
+        self._flush_timer = None
+        atexit.register(self.flush_writes)
+        # Started on the first python3 script; False if it can't run here
+        self._zygote = None
+        self._zygote_lock = threading.Lock()
+        # (epoch second, its formatted "YYYY-MM-DDTHH:MM:SS") for _timestamp
+        self._ts_cache = (0, "")
 
     def _resolve_path(self, filename: str) -> Path:
         """Resolve a filename to a real path within workspace.
@@ -195,19 +467,147 @@ class SurfaceServer:
         """
         # Sanitize filename
         filename = os.path.basename(filename)
-        real_path = (self.workspace_path / filename).resolve()
+        real_str = os.path.realpath(os.path.join(self._workspace_str, filename))
 
         # Security check: ensure path is within workspace
-        try:
-            real_path.relative_to(self.workspace_path)
-        except ValueError:
+        if real_str != self._workspace_str and not real_str.startswith(self._workspace_prefix):
             raise ValueError(f"Path traversal attempt detected: {filename}")
 
-        return real_path
+        return Path(real_str)
+
+    def _stat_resolved(self, filename: str) -> tuple:
+        """Resolve a filename within the workspace and stat it in one go.
+
+        A plain name directly under the (already resolved) workspace can't
+        escape it, so only symlinks and "."/".." go through _resolve_path.
+        Returns (path, stat result), with None for the stat if the file
+        doesn't exist.
+
+        Raises:
+            ValueError: on a path traversal attempt
+        """
+        name = os.path.basename(filename)
+        filepath = self.workspace_path / name
+        if name in (".", "..") or os.path.islink(filepath):
+            filepath = self._resolve_path(name)
+        try:
+            return filepath, filepath.stat()
+        except FileNotFoundError:
+            return filepath, None
+
+    def _read_cached(self, filepath: Path, st: os.stat_result = None) -> str:
+        """Read a workspace file as text, reusing the cached copy if unchanged.
+
+        Entries are validated against the file's (mtime_ns, size), using st
+        if the caller already has it; files over READ_CACHE_MAX_BYTES are
+        read without caching.
+        """
+        if st is None:
+            st = filepath.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        with self._cache_lock:
+            cached = self._read_cache.get(filepath)
+            if cached is not None and cached[0] == key:
+                self._read_cache.move_to_end(filepath)
+                return cached[1]
+
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        if st.st_size <= READ_CACHE_MAX_BYTES:
+            with self._cache_lock:
+                self._read_cache[filepath] = (key, content)
+                self._read_cache.move_to_end(filepath)
+                if len(self._read_cache) > READ_CACHE_SIZE:
+                    self._read_cache.popitem(last=False)
+        return content
+
+    def _pending_text(self, filepath: Path):
+        """Text of a not-yet-flushed write to filepath, or None."""
+        with self._write_lock:
+            return self._pending_writes.get(filepath)
+
+    def flush_writes(self) -> None:
+        """Write all pending workspace writes to disk."""
+        with self._write_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending, self._pending_writes = self._pending_writes, {}
+            for filepath, content in pending.items():
+                try:
+                    with open(filepath, 'w', encoding='utf-8') as f:
+                        f.write(content)
+                except Exception as e:
+                    print(f"[SURFACE] Failed to write {filepath.name}: {e}", file=sys.stderr)
+
+    def _get_zygote(self):
+        """The script zygote, started on first use; None where unsupported."""
+        with self._zygote_lock:
+            if self._zygote is False:
+                return None
+            if self._zygote is None or not self._zygote.alive:
+                if not hasattr(socket, "send_fds") or not hasattr(socket, "SOCK_SEQPACKET"):
+                    self._zygote = False
+                    return None
+                try:
+                    self._zygote = ScriptZygote("python3")
+                except OSError:
+                    self._zygote = False
+                    return None
+                atexit.register(self._zygote.close)
+            return self._zygote
+
+    def _run_script(self, cmd: list) -> tuple:
+        """Run a script command in the workspace.
+
+        python3 scripts are forked from the pre-warmed zygote when it's
+        free; anything else gets a fresh interpreter, launched with
+        posix_spawn when the process is already in the workspace. Returns
+        (returncode, stdout, stderr) with the output decoded as text.
+
+        Raises:
+            subprocess.TimeoutExpired: if the script runs past SCRIPT_TIMEOUT
+        """
+        if cmd[0] == "python3" and all(isinstance(arg, str) for arg in cmd):
+            zygote = self._get_zygote()
+            if zygote is not None:
+                try:
+                    returncode, stdout, stderr = zygote.run(
+                        cmd[1], cmd[2:], self._workspace_str, SCRIPT_TIMEOUT
+                    )
+                    return returncode, decode_output(stdout), decode_output(stderr)
+                except ZygoteUnavailable:
+                    pass
+
+        if hasattr(os, "posix_spawnp") and os.getcwd() == self._workspace_str:
+            returncode, stdout, stderr = spawn_script(cmd, SCRIPT_TIMEOUT)
+            return returncode, decode_output(stdout), decode_output(stderr)
+
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=SCRIPT_TIMEOUT,
+            cwd=self._workspace_str
+        )
+        return result.returncode, result.stdout, result.stderr
+
+    def _timestamp(self) -> str:
+        """Current UTC time as a naive ISO 8601 string with microseconds.
+
+        Same shape as datetime.utcnow().isoformat(); the date/time part is
+        only reformatted when the second changes.
+        """
+        ns = time.time_ns()
+        sec = ns // 1_000_000_000
+        if sec != self._ts_cache[0]:
+            self._ts_cache = (sec, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec)))
+        return f"{self._ts_cache[1]}.{ns // 1_000 % 1_000_000:06d}"
 
     def surface_content(self, content: str, content_type: str, title: str = None, save_to_workspace: bool = False) -> dict:
         """Surface content to the user."""
-        content_id = str(uuid.uuid4())[:8]
+        content_id = secrets.token_hex(4)
 
         result = {
             "type": "surface_content",
@@ -215,7 +615,7 @@ class SurfaceServer:
             "content": content,
             "content_type": content_type,
             "title": title,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._timestamp(),
             "conversation_id": self.conversation_id
         }
 
@@ -233,13 +633,15 @@ class SurfaceServer:
     def workspace_read(self, filename: str) -> str:
         """Read a file from the workspace."""
         try:
-            filepath = self._resolve_path(filename)
-            if not filepath.exists():
+            filepath, st = self._stat_resolved(filename)
+            pending = self._pending_text(filepath)
+            if pending is not None:
+                return pending
+            if st is None:
                 return f"Error: File '{filename}' not found in workspace"
-            if filepath.is_dir():
+            if stat.S_ISDIR(st.st_mode):
                 return f"Error: '{filename}' is a directory"
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return f.read()
+            return self._read_cached(filepath, st)
         except ValueError as e:
             return f"Error: {e}"
         except UnicodeDecodeError:
@@ -248,11 +650,25 @@ class SurfaceServer:
             return f"Error reading file: {e}"
 
     def workspace_write(self, filename: str, content: str) -> str:
-        """Write content to a file in the workspace."""
+        """Write content to a file in the workspace.
+
+        The write is held for WRITE_FLUSH_DELAY so repeated writes coalesce;
+        reads through this server see it immediately, and anything that
+        looks at the disk (listing, scripts) flushes first.
+        """
         try:
             filepath = self._resolve_path(filename)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            if filepath.is_dir():
+                return f"Error writing file: '{filename}' is a directory"
+            with self._write_lock:
+                self._pending_writes[filepath] = content
+                # Don't trust mtimes for a rewrite within the clock's granularity
+                with self._cache_lock:
+                    self._read_cache.pop(filepath, None)
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(WRITE_FLUSH_DELAY, self.flush_writes)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
             return f"Successfully wrote {len(content)} characters to '{filename}'"
         except ValueError as e:
             return f"Error: {e}"
@@ -261,16 +677,17 @@ class SurfaceServer:
 
     def workspace_list(self) -> str:
         """List files in the workspace."""
+        self.flush_writes()
         try:
             files = []
-            for item in self.workspace_path.iterdir():
-                if item.name.startswith('.'):
-                    continue
-                if item.is_file():
-                    size = item.stat().st_size
-                    files.append(f"{item.name} ({size} bytes)")
-                elif item.is_dir():
-                    files.append(f"{item.name}/ (directory)")
+            with os.scandir(self.workspace_path) as it:
+                for entry in sorted(it, key=lambda entry: entry.name):
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_file():
+                        files.append(f"{entry.name} ({entry.stat().st_size} bytes)")
+                    elif entry.is_dir():
+                        files.append(f"{entry.name}/ (directory)")
 
             if not files:
                 return "Workspace is empty"
@@ -281,14 +698,14 @@ class SurfaceServer:
     def surface_from_file(self, filename: str, content_type: str, title: str = None) -> dict:
         """Read a file from workspace and surface its content."""
         try:
-            filepath = self._resolve_path(filename)
-            if not filepath.exists():
-                return {"error": f"File '{filename}' not found in workspace"}
-            if filepath.is_dir():
-                return {"error": f"'{filename}' is a directory"}
-
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            filepath, st = self._stat_resolved(filename)
+            content = self._pending_text(filepath)
+            if content is None:
+                if st is None:
+                    return {"error": f"File '{filename}' not found in workspace"}
+                if stat.S_ISDIR(st.st_mode):
+                    return {"error": f"'{filename}' is a directory"}
+                content = self._read_cached(filepath, st)
 
             # Use surface_content to create the result
             return self.surface_content(content, content_type, title or filename)
@@ -303,25 +720,18 @@ class SurfaceServer:
     def surface_from_script(self, script_file: str, content_type: str, title: str = None,
                            interpreter: str = None, args: list = None) -> dict:
         """Execute a script and surface its stdout output."""
-        import subprocess
+        # The script may read files this server hasn't flushed yet
+        self.flush_writes()
 
         try:
-            filepath = self._resolve_path(script_file)
-            if not filepath.exists():
+            filepath, st = self._stat_resolved(script_file)
+            if st is None:
                 return {"error": f"Script '{script_file}' not found in workspace"}
 
             # Auto-detect interpreter from extension if not provided
             if not interpreter:
                 ext = filepath.suffix.lower()
-                interpreter_map = {
-                    '.py': 'python3',
-                    '.js': 'node',
-                    '.sh': 'bash',
-                    '.rb': 'ruby',
-                    '.pl': 'perl',
-                    '.php': 'php',
-                }
-                interpreter = interpreter_map.get(ext)
+                interpreter = INTERPRETER_MAP.get(ext)
                 if not interpreter:
                     return {"error": f"Cannot auto-detect interpreter for '{ext}'. Please specify interpreter."}
 
@@ -332,19 +742,12 @@ class SurfaceServer:
 
             # Execute with timeout and capture output
             try:
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=30,  # 30 second timeout
-                    cwd=str(self.workspace_path)
-                )
-
-                if result.returncode != 0:
-                    error_msg = result.stderr or f"Script exited with code {result.returncode}"
+                returncode, content, stderr = self._run_script(cmd)
+
+                if returncode != 0:
+                    error_msg = stderr or f"Script exited with code {returncode}"
                     return {"error": f"Script execution failed: {error_msg}"}
 
-                content = result.stdout
                 if not content.strip():
                     return {"error": "Script produced no output"}
 
@@ -360,9 +763,83 @@ class SurfaceServer:
             return {"error": f"Error executing script: {e}"}
 
 
+# tools/call name -> (SurfaceServer method, ((argument, default), ...),
+# whether it returns surface data rather than text)
+TOOL_DISPATCH = {
+    "workspace_read": (SurfaceServer.workspace_read, (("filename", ""),), False),
+    "workspace_write": (SurfaceServer.workspace_write, (("filename", ""), ("content", "")), False),
+    "workspace_list": (SurfaceServer.workspace_list, (), False),
+    "surface_from_file": (
+        SurfaceServer.surface_from_file,
+        (("filename", ""), ("content_type", "markdown"), ("title", None)),
+        True
+    ),
+    "surface_from_script": (
+        SurfaceServer.surface_from_script,
+        (("script_file", ""), ("content_type", "markdown"), ("title", None),
+         ("interpreter", None), ("args", None)),
+        True
+    ),
+}
+
+
+def call_tool(server: SurfaceServer, entry: tuple, arguments: dict):
+    """Run a TOOL_DISPATCH entry.
+
+    Returns (result_text, is_error, surface_json). For a surface tool that
+    succeeds, surface_json is its result serialized to JSON bytes and
+    result_text is None; otherwise surface_json is None.
+    """
+    handler, arg_spec, returns_data = entry
+    try:
+        result = handler(server, **{name: arguments.get(name, default) for name, default in arg_spec})
+        if not returns_data:
+            # Check if result indicates an error
+            return result, result.startswith("Error:"), None
+        if "error" in result:
+            return f"Error: {result['error']}", True, None
+        return None, False, json_dumps(result)
+    except Exception as e:
+        return f"Error: {str(e)}", True, None
+
+
+def encode_tool_call(server: SurfaceServer, request: dict) -> bytes:
+    """Handle a tools/call request and return its response line.
+
+    Surface results are serialized once and spliced into the envelope as
+    a JSON string. Serialized JSON holds no raw control characters, so
+    escaping backslashes and quotes is all that string needs, rather than
+    decoding it and running it through the encoder a second time.
+    """
+    params = request.get("params", {})
+    entry = TOOL_DISPATCH.get(params.get("name", ""))
+    if entry is None or not entry[2]:
+        return json_dumps_line(handle_request(server, request))
+
+    result_text, is_error, surface_json = call_tool(server, entry, params.get("arguments", {}))
+    if surface_json is None:
+        return json_dumps_line({
+            "jsonrpc": "2.0",
+            "id": request.get("id"),
+            "result": {
+                "content": [{"type": "text", "text": result_text}],
+                "isError": is_error
+            }
+        })
+    return b"".join((
+        SURFACE_RESPONSE_PREFIX, json_dumps(request.get("id")), SURFACE_RESPONSE_MIDDLE,
+        surface_json.replace(b"\\", b"\\\\").replace(b'"', b'\\"'),
+        SURFACE_RESPONSE_SUFFIX,
+    ))
+
+
 def handle_request(server: SurfaceServer, request: dict) -> dict:
     """Handle an MCP JSON-RPC request."""
     method = request.get("method", "")
+    # Notifications (initialized, cancelled, ...) never get a response
+    if isinstance(method, str) and method.startswith("notifications/"):
+        return None
+
     request_id = request.get("id")
     params = request.get("params", {})
 
@@ -382,79 +859,30 @@ def handle_request(server: SurfaceServer, request: dict) -> dict:
             }
         }
 
-    elif method == "notifications/initialized":
-        return None
-
     elif method == "tools/list":
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "tools": get_surface_tools()
-            }
+            "result": TOOLS_LIST_RESULT
         }
 
     elif method == "tools/call":
         tool_name = params.get("name", "")
         arguments = params.get("arguments", {})
 
-        result_text = ""
-        is_error = False
-        result_data = None
-
-        try:
-            if tool_name == "workspace_read":
-                result_text = server.workspace_read(
-                    filename=arguments.get("filename", "")
-                )
-            elif tool_name == "workspace_write":
-                result_text = server.workspace_write(
-                    filename=arguments.get("filename", ""),
-                    content=arguments.get("content", "")
-                )
-            elif tool_name == "workspace_list":
-                result_text = server.workspace_list()
-            elif tool_name == "surface_from_file":
-                result_data = server.surface_from_file(
-                    filename=arguments.get("filename", ""),
-                    content_type=arguments.get("content_type", "markdown"),
-                    title=arguments.get("title")
-                )
-                if "error" in result_data:
-                    result_text = f"Error: {result_data['error']}"
-                    is_error = True
-                else:
-                    result_text = json.dumps(result_data)
-            elif tool_name == "surface_from_script":
-                result_data = server.surface_from_script(
-                    script_file=arguments.get("script_file", ""),
-                    content_type=arguments.get("content_type", "markdown"),
-                    title=arguments.get("title"),
-                    interpreter=arguments.get("interpreter"),
-                    args=arguments.get("args")
-                )
-                if "error" in result_data:
-                    result_text = f"Error: {result_data['error']}"
-                    is_error = True
-                else:
-                    result_text = json.dumps(result_data)
-            else:
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Unknown tool: {tool_name}"
-                    }
+        entry = TOOL_DISPATCH.get(tool_name)
+        if entry is None:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": -32601,
+                    "message": f"Unknown tool: {tool_name}"
                 }
-
-            # Check if result indicates an error
-            if result_text.startswith("Error:"):
-                is_error = True
-
-        except Exception as e:
-            result_text = f"Error: {str(e)}"
-            is_error = True
+            }
+        result_text, is_error, surface_json = call_tool(server, entry, arguments)
+        if surface_json is not None:
+            result_text = surface_json.decode()
 
         return {
             "jsonrpc": "2.0",
@@ -476,6 +904,162 @@ def handle_request(server: SurfaceServer, request: dict) -> dict:
         }
 
 
+def handle_batch(server: SurfaceServer, requests: list):
+    """Handle a JSON-RPC batch.
+
+    Each entry is handled independently and notifications produce no
+    response. Returns the list of responses, a single error for an
+    empty batch, or None when there is nothing to send back.
+    """
+    if not requests:
+        return {
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {
+                "code": -32600,
+                "message": "Invalid Request: empty batch"
+            }
+        }
+
+    responses = []
+    for request in requests:
+        if not isinstance(request, dict):
+            responses.append({
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": -32600,
+                    "message": "Invalid Request"
+                }
+            })
+            continue
+        try:
+            response = handle_request(server, request)
+        except Exception as e:
+            response = {
+                "jsonrpc": "2.0",
+                "id": request.get("id"),
+                "error": {
+                    "code": -32603,
+                    "message": f"Internal error: {str(e)}"
+                }
+            }
+        if response is not None:
+            responses.append(response)
+
+    return responses or None
+
+
+def read_frames(fd: int, chunk_size: int = 65536, max_frame: int = MAX_FRAME_BYTES):
+    """Yield newline-delimited frames read from a file descriptor.
+
+    Reads whatever is available with os.read and splits on newlines by
+    hand, skipping the buffered reader (and its lock) entirely. A frame
+    longer than max_frame is dropped as soon as it's known to be too long
+    and reported as OVERSIZED_FRAME instead of being buffered in full.
+    """
+    buf = bytearray()
+    discarding = False
+    while chunk := os.read(fd, chunk_size):
+        if discarding:
+            nl = chunk.find(b"\n")
+            if nl < 0:
+                continue
+            chunk = chunk[nl + 1:]
+            discarding = False
+
+        # Only the new data can hold the next newline
+        scan = len(buf)
+        buf += chunk
+        start = 0
+        while (end := buf.find(b"\n", scan)) >= 0:
+            yield buf[start:end] if end - start <= max_frame else OVERSIZED_FRAME
+            start = scan = end + 1
+        del buf[:start]
+
+        if len(buf) > max_frame:
+            buf.clear()
+            discarding = True
+            yield OVERSIZED_FRAME
+    if buf:
+        yield buf
+
+
+def write_frame(fd: int, data: bytes) -> None:
+    """Write data to a file descriptor, retrying short writes."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def encode_response(server: SurfaceServer, request) -> bytes:
+    """Handle a decoded request or batch; returns the response line (b"" if none)."""
+    try:
+        if isinstance(request, dict) and request.get("method") == "tools/call":
+            return encode_tool_call(server, request)
+        if isinstance(request, list):
+            response = handle_batch(server, request)
+        else:
+            response = handle_request(server, request)
+        return b"" if response is None else json_dumps_line(response)
+    except Exception as e:
+        return INTERNAL_ERROR_TEMPLATE % json_dumps(f"Internal error: {str(e)}")
+
+
+async def serve(server: SurfaceServer, in_fd: int, out_fd: int) -> None:
+    """Read requests from in_fd and answer them on out_fd.
+
+    Requests are handled concurrently on a thread pool, so a long script
+    doesn't hold up reads queued behind it; responses are written as each
+    finishes (JSON-RPC matches them up by id). Only the event loop thread
+    writes to out_fd, so frames never interleave.
+    """
+    loop = asyncio.get_running_loop()
+
+    # A daemon thread reads stdin, so a blocked read never holds up exit
+    frames = asyncio.Queue()
+
+    def pump():
+        for frame in read_frames(in_fd):
+            loop.call_soon_threadsafe(frames.put_nowait, frame)
+        loop.call_soon_threadsafe(frames.put_nowait, None)
+
+    threading.Thread(target=pump, name="surface-stdin", daemon=True).start()
+
+    async def respond(request) -> None:
+        data = await loop.run_in_executor(executor, encode_response, server, request)
+        if data:
+            write_frame(out_fd, data)
+
+    tasks = set()
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CALLS) as executor:
+        while (line := await frames.get()) is not None:
+            if line is OVERSIZED_FRAME:
+                write_frame(out_fd, OVERSIZED_FRAME_ERROR)
+                continue
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                request = json_loads(line)
+            except json.JSONDecodeError as e:
+                write_frame(out_fd, PARSE_ERROR_TEMPLATE % json_dumps(f"Parse error: {str(e)}"))
+                continue
+
+            if isinstance(request, dict) and request.get("method") == "tools/list":
+                write_frame(out_fd, TOOLS_LIST_RESPONSE_PREFIX + json_dumps(request.get("id"))
+                            + TOOLS_LIST_RESPONSE_SUFFIX)
+                continue
+
+            task = asyncio.create_task(respond(request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+
 def main():
     """Main loop - read JSON-RPC messages from stdin, write responses to stdout."""
     parser = argparse.ArgumentParser(description="Surface Content MCP Server")
@@ -493,41 +1077,15 @@ def main():
 
     server = SurfaceServer(args.workspace_path, args.conversation_id)
 
-    # Unbuffered output
-    sys.stdout = open(sys.stdout.fileno(), mode='w', buffering=1)
+    # Scripts run in the workspace; starting there lets them be spawned directly
+    os.chdir(server.workspace_path)
 
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
+    # Exit normally on SIGTERM so atexit flushes pending workspace writes
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
 
-        try:
-            request = json.loads(line)
-            response = handle_request(server, request)
+    asyncio.run(serve(server, sys.stdin.fileno(), sys.stdout.fileno()))
 
-            if response is not None:
-                print(json.dumps(response), flush=True)
-
-        except json.JSONDecodeError as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32700,
-                    "message": f"Parse error: {str(e)}"
-                }
-            }
-            print(json.dumps(error_response), flush=True)
-        except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32603,
-                    "message": f"Internal error: {str(e)}"
-                }
-            }
-            print(json.dumps(error_response), flush=True)
+    server.flush_writes()
 
 
 if __name__ == "__main__":